@@ -7,18 +7,23 @@ Características: Backup automático, compressão, criptografia, recovery point,
 
 import gzip
 import hashlib
+import heapq
 import json
 import logging
 import os
 import pickle
+import re
 import shutil
 import sqlite3
 import subprocess
 import tempfile
 import threading
 import time
+import uuid
 import zipfile
-from dataclasses import asdict, dataclass
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
@@ -27,10 +32,28 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import schedule
 import yaml
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _json_dumps(obj: Any) -> str:
+    """Serializar para JSON (orjson quando disponível)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def _json_loads(data: str) -> Any:
+    """Desserializar JSON (orjson quando disponível)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 class BackupType(Enum):
     """Tipos de backup"""
     FULL = "full"
@@ -57,7 +80,7 @@ class RecoveryStatus(Enum):
     FAILED = "failed"
     PARTIAL = "partial"
 
-@dataclass
+@dataclass(slots=True)
 class BackupJob:
     """Job de backup"""
     id: str
@@ -75,8 +98,9 @@ class BackupJob:
     checksum: Optional[str] = None
     error_message: Optional[str] = None
     metadata: Dict[str, Any] = None
+    retention_class: str = 'normal'   # 'emergency' fica fora da rotação de cleanup
 
-@dataclass
+@dataclass(slots=True)
 class RecoveryJob:
     """Job de recovery"""
     id: str
@@ -91,6 +115,30 @@ class RecoveryJob:
     error_message: Optional[str] = None
     rollback_available: bool = True
 
+# Colunas de backup_jobs lidas por _row_to_backup_job
+BACKUP_JOB_COLUMNS = (
+    'id, type, source_paths, target_path, compression, encryption, status, '
+    'start_time, end_time, file_count, total_size, compressed_size, '
+    'checksum, error_message, metadata, retention_class'
+)
+
+# Arquivos de backup geridos pela rotação: full_backup_* e incremental_backup_*
+BACKUP_FILE_PATTERN = re.compile(r'(full|incremental)_backup_')
+
+# Statements reutilizados (mesma string -> hit no cache de statements do sqlite3)
+LOAD_BACKUP_JOB_SQL = f'SELECT {BACKUP_JOB_COLUMNS} FROM backup_jobs WHERE id = ?'
+LOAD_ALL_BACKUP_JOBS_SQL = f'SELECT {BACKUP_JOB_COLUMNS} FROM backup_jobs'
+SAVE_BACKUP_JOB_SQL = (
+    f'INSERT OR REPLACE INTO backup_jobs ({BACKUP_JOB_COLUMNS}) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+SAVE_RECOVERY_JOB_SQL = (
+    'INSERT OR REPLACE INTO recovery_jobs '
+    '(id, backup_id, target_paths, status, start_time, end_time, '
+    'files_restored, total_size, verified, error_message, rollback_available) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
 class AutomaticBackupSystem:
     """Sistema automático de backup e recovery"""
 
@@ -107,10 +155,22 @@ class AutomaticBackupSystem:
 
         # Estado interno
         self.backup_jobs = {}
+        self._backup_stats = Counter()    # (tipo, status) -> quantidade
+        self._job_stat_keys = {}          # job_id -> (tipo, status) contabilizado
+        self._last_backup_ref = None
+        self._jobs_lock = threading.RLock()
         self.recovery_jobs = {}
         self.backup_history = []
+        self._target_size_cache = {}
         self.monitoring_active = False
         self.scheduler_thread = None
+        self._backup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+        self._wake_event = threading.Event()
+        self._next_run_iso = None
+
+        # Conexão persistente partilhada entre threads de backup
+        self._conn = None
+        self._db_lock = threading.RLock()
 
         # Configurações
         self.config = self._load_config()
@@ -123,6 +183,9 @@ class AutomaticBackupSystem:
         # Inicializar base de dados
         self._init_database()
 
+        # Carregar jobs existentes em memória
+        self._load_all_backup_jobs()
+
         # Iniciar agendador
         self._start_scheduler()
 
@@ -131,9 +194,18 @@ class AutomaticBackupSystem:
     def _init_database(self):
         """Inicializar base de dados de backup"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                         cached_statements=256)
+            self._conn.row_factory = sqlite3.Row
+            conn = self._conn
             cursor = conn.cursor()
 
+            # Carga dominada por leituras: páginas maiores (só aplica numa base
+            # nova, antes da primeira tabela), mmap e cache de páginas maior
+            cursor.execute('PRAGMA page_size=8192')
+            cursor.execute('PRAGMA mmap_size=268435456')
+            cursor.execute('PRAGMA cache_size=-32000')
+
             # Tabela de jobs de backup
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS backup_jobs (
@@ -151,10 +223,18 @@ class AutomaticBackupSystem:
                     compressed_size INTEGER,
                     checksum TEXT,
                     error_message TEXT,
-                    metadata TEXT
+                    metadata TEXT,
+                    retention_class TEXT DEFAULT 'normal'
                 )
             ''')
 
+            # Migrar bases existentes criadas antes de retention_class
+            columns = [row[1] for row in cursor.execute('PRAGMA table_info(backup_jobs)')]
+            if 'retention_class' not in columns:
+                cursor.execute('''
+                    ALTER TABLE backup_jobs ADD COLUMN retention_class TEXT DEFAULT 'normal'
+                ''')
+
             # Tabela de jobs de recovery
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS recovery_jobs (
@@ -185,8 +265,25 @@ class AutomaticBackupSystem:
                 )
             ''')
 
+            # Índices para ordenação por data (cleanup e último backup);
+            # (start_time, id) cobre as consultas sem acessar a tabela
+            cursor.execute('DROP INDEX IF EXISTS idx_backup_jobs_start')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_backup_jobs_start_id
+                ON backup_jobs(start_time DESC, id)
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_backup_jobs_retention
+                ON backup_jobs(retention_class, start_time DESC)
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_recovery_jobs_start
+                ON recovery_jobs(start_time DESC)
+            ''')
+
             conn.commit()
-            conn.close()
 
         except Exception as e:
             print(f"❌ Erro ao inicializar database de backup: {e}")
@@ -271,17 +368,20 @@ class AutomaticBackupSystem:
             print(f"⚠️  Erro ao carregar configuração: {e}")
             return default_config
 
-    def create_full_backup(self, description: str = "Backup completo") -> str:
+    def create_full_backup(self, description: str = "Backup completo",
+                           retention_class: str = 'normal') -> str:
         """Criar backup completo"""
         try:
-            backup_id = f"full_{int(time.time())}"
+            # Id único: dois backups no mesmo segundo não se sobrescrevem
+            unique = uuid.uuid4().hex
+            backup_id = f"full_{unique}"
 
             # Definir paths de origem
             source_paths = self.config['paths_to_backup']
 
             # Definir destino
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            target_path = os.path.join(self.backup_dir, f"full_backup_{timestamp}.zip")
+            target_path = os.path.join(self.backup_dir, f"full_backup_{timestamp}_{unique}.zip")
 
             # Configurações de backup
             compression = self.config['backup']['compression']['enabled']
@@ -297,13 +397,13 @@ class AutomaticBackupSystem:
                 encryption=encryption,
                 status=BackupStatus.PENDING,
                 start_time=datetime.now().isoformat(),
-                metadata={'description': description}
+                metadata={'description': description},
+                retention_class=retention_class
             )
 
-            # Executar backup em thread separada
-            thread = threading.Thread(target=self._execute_backup, args=(job,))
-            thread.daemon = True
-            thread.start()
+            # Registrar job pendente e executar no worker de backup
+            self._save_backup_job(job)
+            self._backup_pool.submit(self._execute_backup, job)
 
             logger.info(f"Backup completo iniciado: {backup_id}")
             return backup_id
@@ -315,7 +415,8 @@ class AutomaticBackupSystem:
     def create_incremental_backup(self, last_backup_id: str = None) -> str:
         """Criar backup incremental"""
         try:
-            backup_id = f"inc_{int(time.time())}"
+            unique = uuid.uuid4().hex
+            backup_id = f"inc_{unique}"
 
             # Se não especificado, encontrar último backup
             if not last_backup_id:
@@ -330,7 +431,7 @@ class AutomaticBackupSystem:
 
             # Definir destino
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            target_path = os.path.join(self.backup_dir, f"incremental_backup_{timestamp}.zip")
+            target_path = os.path.join(self.backup_dir, f"incremental_backup_{timestamp}_{unique}.zip")
 
             # Criar job
             job = BackupJob(
@@ -345,10 +446,9 @@ class AutomaticBackupSystem:
                 metadata={'base_backup_id': last_backup_id}
             )
 
-            # Executar backup
-            thread = threading.Thread(target=self._execute_backup, args=(job,))
-            thread.daemon = True
-            thread.start()
+            # Registrar job pendente e executar no worker de backup
+            self._save_backup_job(job)
+            self._backup_pool.submit(self._execute_backup, job)
 
             logger.info(f"Backup incremental iniciado: {backup_id}")
             return backup_id
@@ -417,7 +517,6 @@ class AutomaticBackupSystem:
 
             # Salvar job
             self._save_backup_job(job)
-            self.backup_jobs[job.id] = job
 
             logger.info(f"Backup {job.id} concluído: {file_count} arquivos, {total_size} bytes")
 
@@ -493,18 +592,13 @@ class AutomaticBackupSystem:
     def _get_last_backup_id(self) -> Optional[str]:
         """Obter ID do último backup"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                SELECT id FROM backup_jobs
-                WHERE status = 'completed'
-                ORDER BY start_time DESC
-                LIMIT 1
-            ''')
-
-            result = cursor.fetchone()
-            conn.close()
+            with self._db_lock:
+                result = self._conn.execute('''
+                    SELECT id FROM backup_jobs
+                    WHERE status = 'completed'
+                    ORDER BY start_time DESC
+                    LIMIT 1
+                ''').fetchone()
 
             return result[0] if result else None
 
@@ -769,124 +863,177 @@ class AutomaticBackupSystem:
 
     def _save_backup_job(self, job: BackupJob):
         """Salvar job de backup no banco"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        self._save_backup_jobs_bulk([job])
 
-            cursor.execute('''
-                INSERT OR REPLACE INTO backup_jobs
-                (id, type, source_paths, target_path, compression, encryption,
-                 status, start_time, end_time, file_count, total_size,
-                 compressed_size, checksum, error_message, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job.id, job.type.value, json.dumps(job.source_paths), job.target_path,
+    def _save_backup_jobs_bulk(self, jobs: List[BackupJob]):
+        """Salvar vários jobs de backup numa única transação"""
+        try:
+            rows = [(
+                job.id, job.type.value, _json_dumps(job.source_paths), job.target_path,
                 job.compression, job.encryption, job.status.value, job.start_time,
                 job.end_time, job.file_count, job.total_size, job.compressed_size,
-                job.checksum, job.error_message, json.dumps(job.metadata or {})
-            ))
+                job.checksum, job.error_message, _json_dumps(job.metadata or {}),
+                job.retention_class
+            ) for job in jobs]
 
-            conn.commit()
-            conn.close()
+            with self._db_lock, self._conn:
+                self._conn.executemany(SAVE_BACKUP_JOB_SQL, rows)
+
+            for job in jobs:
+                self._cache_backup_job(job)
 
         except Exception as e:
             logger.error(f"Erro ao salvar job de backup: {e}")
 
     def _save_recovery_job(self, job: RecoveryJob):
         """Salvar job de recovery no banco"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        self._save_recovery_jobs_bulk([job])
 
-            cursor.execute('''
-                INSERT OR REPLACE INTO recovery_jobs
-                (id, backup_id, target_paths, status, start_time, end_time,
-                 files_restored, total_size, verified, error_message, rollback_available)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job.id, job.backup_id, json.dumps(job.target_paths), job.status.value,
+    def _save_recovery_jobs_bulk(self, jobs: List[RecoveryJob]):
+        """Salvar vários jobs de recovery numa única transação"""
+        try:
+            rows = [(
+                job.id, job.backup_id, _json_dumps(job.target_paths), job.status.value,
                 job.start_time, job.end_time, job.files_restored, job.total_size,
                 job.verified, job.error_message, job.rollback_available
-            ))
+            ) for job in jobs]
 
-            conn.commit()
-            conn.close()
+            with self._db_lock, self._conn:
+                self._conn.executemany(SAVE_RECOVERY_JOB_SQL, rows)
 
         except Exception as e:
             logger.error(f"Erro ao salvar job de recovery: {e}")
 
     def _load_backup_job(self, backup_id: str) -> Optional[BackupJob]:
-        """Carregar job de backup do banco"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        """Carregar job de backup (cache em memória, com fallback ao banco)"""
+        job = self.backup_jobs.get(backup_id)
+        if job:
+            return job
 
-            cursor.execute('''
-                SELECT * FROM backup_jobs WHERE id = ?
-            ''', (backup_id,))
-
-            row = cursor.fetchone()
-            conn.close()
+        try:
+            with self._db_lock:
+                row = self._conn.execute(LOAD_BACKUP_JOB_SQL, (backup_id,)).fetchone()
 
             if row:
-                return BackupJob(
-                    id=row[0],
-                    type=BackupType(row[1]),
-                    source_paths=json.loads(row[2]),
-                    target_path=row[3],
-                    compression=bool(row[4]),
-                    encryption=bool(row[5]),
-                    status=BackupStatus(row[6]),
-                    start_time=row[7],
-                    end_time=row[8],
-                    file_count=row[9],
-                    total_size=row[10],
-                    compressed_size=row[11],
-                    checksum=row[12],
-                    error_message=row[13],
-                    metadata=json.loads(row[14]) if row[14] else {}
-                )
+                job = self._row_to_backup_job(row)
+                self._cache_backup_job(job)
+                return job
 
         except Exception as e:
             logger.error(f"Erro ao carregar job de backup: {e}")
 
         return None
 
+    def _load_all_backup_jobs(self):
+        """Carregar todos os jobs de backup com um único SELECT"""
+        try:
+            with self._db_lock:
+                cursor = self._conn.execute(LOAD_ALL_BACKUP_JOBS_SQL)
+
+                while True:
+                    rows = cursor.fetchmany(1000)
+                    if not rows:
+                        break
+                    for row in rows:
+                        self._cache_backup_job(self._row_to_backup_job(row))
+
+        except Exception as e:
+            logger.error(f"Erro ao carregar jobs de backup: {e}")
+
+    def _cache_backup_job(self, job: BackupJob):
+        """Atualizar cache em memória e estatísticas incrementais do job"""
+        key = (job.type.value, job.status.value)
+        with self._jobs_lock:
+            self.backup_jobs[job.id] = job
+
+            previous_key = self._job_stat_keys.get(job.id)
+            if previous_key != key:
+                if previous_key:
+                    self._backup_stats[previous_key] -= 1
+                self._backup_stats[key] += 1
+                self._job_stat_keys[job.id] = key
+
+            last = self._last_backup_ref
+            if last is None or last is job or job.start_time >= last.start_time:
+                self._last_backup_ref = job
+
+    def _rebuild_backup_stats(self, last_backup_id: Optional[str]):
+        """Recalcular estatísticas a partir do cache (após remoções)
+
+        O id do último backup vem do chamador, lido no banco antes de
+        tomar _jobs_lock (ordem de locks: _db_lock -> _jobs_lock).
+        """
+        with self._jobs_lock:
+            self._job_stat_keys = {
+                job.id: (job.type.value, job.status.value)
+                for job in self.backup_jobs.values()
+            }
+            self._backup_stats = Counter(self._job_stat_keys.values())
+            self._last_backup_ref = self.backup_jobs.get(last_backup_id)
+
+    def _row_to_backup_job(self, row: sqlite3.Row) -> BackupJob:
+        """Converter linha do banco em BackupJob"""
+        return BackupJob(
+            id=row['id'],
+            type=BackupType(row['type']),
+            source_paths=_json_loads(row['source_paths']),
+            target_path=row['target_path'],
+            compression=bool(row['compression']),
+            encryption=bool(row['encryption']),
+            status=BackupStatus(row['status']),
+            start_time=row['start_time'],
+            end_time=row['end_time'],
+            file_count=row['file_count'],
+            total_size=row['total_size'],
+            compressed_size=row['compressed_size'],
+            checksum=row['checksum'],
+            error_message=row['error_message'],
+            metadata=_json_loads(row['metadata']) if row['metadata'] else {},
+            retention_class=row['retention_class'] or 'normal'
+        )
+
     def _start_scheduler(self):
         """Iniciar agendador de backups"""
         try:
             schedule.clear()  # Limpar agendamentos existentes
 
-            # Agendar backups
-            full_schedule = self.config['backup']['schedule']['full_backup']
-            incremental_schedule = self.config['backup']['schedule']['incremental_backup']
-            cleanup_schedule = self.config['backup']['schedule']['cleanup']
-
-            schedule.every().sunday.at("02:00").do(self.create_full_backup, "Backup completo agendado")
-            schedule.every().monday.at("02:00").do(self.create_incremental_backup)
-            schedule.every().tuesday.at("02:00").do(self.create_incremental_backup)
-            schedule.every().wednesday.at("02:00").do(self.create_incremental_backup)
-            schedule.every().thursday.at("02:00").do(self.create_incremental_backup)
-            schedule.every().friday.at("02:00").do(self.create_incremental_backup)
-            schedule.every().saturday.at("02:00").do(self.create_incremental_backup)
+            # Agendar backups (completo ao domingo, incremental nos outros dias)
+            schedule.every().day.at("02:00").do(self._daily_backup_dispatch)
 
             # Cleanup
             schedule.every().sunday.at("03:00").do(self._cleanup_old_backups)
 
-            # Thread do scheduler
+            self._update_next_run()
+
+            # Thread do scheduler: dorme até o próximo job (ou até _wake_event)
             def run_scheduler():
                 while True:
+                    idle = schedule.idle_seconds()
+                    if idle is None or idle > 0:
+                        self._wake_event.wait(idle)
+                        self._wake_event.clear()
                     schedule.run_pending()
-                    time.sleep(60)  # Verificar a cada minuto
+                    self._update_next_run()
 
-            self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-            self.scheduler_thread.start()
+            if self.scheduler_thread and self.scheduler_thread.is_alive():
+                # Jobs re-registados: acordar a thread para reavaliar prazos
+                self._wake_event.set()
+            else:
+                self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
+                self.scheduler_thread.start()
 
             logger.info("Agendador de backup iniciado")
 
         except Exception as e:
             logger.error(f"Erro ao iniciar agendador: {e}")
 
+    def _daily_backup_dispatch(self):
+        """Executar backup diário agendado conforme o dia da semana"""
+        if datetime.now().weekday() == 6:  # Domingo
+            self.create_full_backup("Backup completo agendado")
+        else:
+            self.create_incremental_backup()
+
     def _cleanup_old_backups(self):
         """Limpar backups antigos"""
         try:
@@ -897,62 +1044,137 @@ class AutomaticBackupSystem:
             max_full = retention['max_full_backups']
             max_inc = retention['max_incremental_backups']
 
-            # Listar backups
-            full_backups = []
-            incremental_backups = []
-
-            for file in os.listdir(self.backup_dir):
-                if file.startswith('full_backup_'):
-                    full_backups.append(file)
-                elif file.startswith('incremental_backup_'):
-                    incremental_backups.append(file)
-
-            # Ordenar por data
-            full_backups.sort(reverse=True)
-            incremental_backups.sort(reverse=True)
-
-            # Remover backups extras
-            for backup in full_backups[max_full:]:
-                backup_path = os.path.join(self.backup_dir, backup)
-                os.remove(backup_path)
-                logger.info(f"Backup removido: {backup}")
-
-            for backup in incremental_backups[max_inc:]:
-                backup_path = os.path.join(self.backup_dir, backup)
-                os.remove(backup_path)
-                logger.info(f"Backup removido: {backup}")
+            # Backups de emergência ficam fora da rotação
+            with self._db_lock:
+                protected = {
+                    os.path.basename(row['target_path'])
+                    for row in self._conn.execute('''
+                        SELECT target_path FROM backup_jobs
+                        WHERE retention_class != 'normal'
+                    ''')
+                }
 
-            # Limpar jobs antigos do banco
-            self._cleanup_old_backup_jobs()
+            # Listar backups (scandir reaproveita o stat da listagem; o
+            # padrão pré-compilado classifica cada nome num único match)
+            backups_by_kind = {'full': [], 'incremental': []}
+
+            with os.scandir(self.backup_dir) as entries:
+                for entry in entries:
+                    match = BACKUP_FILE_PATTERN.match(entry.name)
+                    if (not match or entry.name in protected
+                            or not entry.is_file(follow_symlinks=False)):
+                        continue
+                    backups_by_kind[match.group(1)].append(entry)
+
+            # Selecionar apenas os excedentes mais antigos por mtime
+            to_delete = []
+            for kind, max_keep in (('full', max_full), ('incremental', max_inc)):
+                backups = backups_by_kind[kind]
+                excess = len(backups) - max_keep
+                if excess > 0:
+                    to_delete.extend(heapq.nsmallest(excess, backups,
+                                                     key=lambda e: e.stat().st_mtime))
+
+            # Remover backups extras (unlink liberta o GIL; remoções em paralelo)
+            removed_paths = set()
+            if to_delete:
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    removed_paths = set(executor.map(self._remove_backup_file,
+                                                     [entry.path for entry in to_delete]))
+                removed_paths.discard(None)
+
+            # Jobs cujos arquivos foram removidos saem do banco na mesma
+            # transação que a limpeza de jobs antigos
+            removed_ids = [job.id for job in list(self.backup_jobs.values())
+                           if job.target_path in removed_paths]
+            self._cleanup_old_backup_jobs(removed_ids)
 
         except Exception as e:
             logger.error(f"Erro no cleanup: {e}")
 
-    def _cleanup_old_backup_jobs(self):
-        """Limpar jobs antigos do banco"""
+    def _remove_backup_file(self, path: str) -> Optional[str]:
+        """Remover arquivo de backup, descartando antes o seu page cache"""
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
+
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Erro ao remover backup {path}: {e}")
+            return None
 
-            # Manter apenas os últimos 100 jobs
-            cursor.execute('''
-                DELETE FROM backup_jobs WHERE id NOT IN (
-                    SELECT id FROM backup_jobs
-                    ORDER BY start_time DESC
-                    LIMIT 100
-                )
-            ''')
+        self._target_size_cache.pop(path, None)
+        logger.info(f"Backup removido: {os.path.basename(path)}")
+        return path
 
-            cursor.execute('''
-                DELETE FROM recovery_jobs WHERE id NOT IN (
-                    SELECT id FROM recovery_jobs
+    def _cleanup_old_backup_jobs(self, removed_ids: List[str] = ()):
+        """Limpar jobs antigos do banco"""
+        try:
+            # Remover jobs de arquivos apagados e manter apenas os últimos
+            # 100 jobs, tudo numa única transação (corte encontrado por
+            # seek no índice de start_time)
+            with self._db_lock, self._conn:
+                cursor = self._conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+
+                # Lotes abaixo do limite de parâmetros do SQLite
+                for i in range(0, len(removed_ids), 500):
+                    chunk = removed_ids[i:i + 500]
+                    placeholders = ', '.join('?' * len(chunk))
+                    cursor.execute(f'DELETE FROM backup_jobs WHERE id IN ({placeholders})',
+                                   chunk)
+
+                cursor.execute('''
+                    DELETE FROM backup_jobs
+                    WHERE retention_class = 'normal' AND start_time < (
+                        SELECT start_time FROM backup_jobs
+                        WHERE retention_class = 'normal'
+                        ORDER BY start_time DESC
+                        LIMIT 1 OFFSET 99
+                    )
+                ''')
+
+                cursor.execute('''
+                    DELETE FROM recovery_jobs WHERE start_time < (
+                        SELECT start_time FROM recovery_jobs
+                        ORDER BY start_time DESC
+                        LIMIT 1 OFFSET 99
+                    )
+                ''')
+
+                cursor.execute('''
+                    SELECT start_time FROM backup_jobs
+                    WHERE retention_class = 'normal'
                     ORDER BY start_time DESC
-                    LIMIT 100
-                )
-            ''')
-
-            conn.commit()
-            conn.close()
+                    LIMIT 1 OFFSET 99
+                ''')
+                cutoff = cursor.fetchone()
+
+                # Último backup via índice (start_time, id), sem varrer o cache
+                cursor.execute('''
+                    SELECT id FROM backup_jobs ORDER BY start_time DESC LIMIT 1
+                ''')
+                last_row = cursor.fetchone()
+
+            # Manter cache em memória consistente com o banco; sob _jobs_lock
+            # para não competir com _cache_backup_job do worker de backup
+            if cutoff or removed_ids:
+                removed = set(removed_ids)
+                with self._jobs_lock:
+                    self.backup_jobs = {
+                        job_id: job for job_id, job in self.backup_jobs.items()
+                        if job_id not in removed and (
+                            not cutoff or job.retention_class != 'normal'
+                            or job.start_time >= cutoff[0])
+                    }
+                    self._rebuild_backup_stats(last_row['id'] if last_row else None)
 
         except Exception as e:
             logger.error(f"Erro ao limpar jobs antigos: {e}")
@@ -960,29 +1182,34 @@ class AutomaticBackupSystem:
     def get_backup_status(self) -> Dict[str, Any]:
         """Obter status dos backups"""
         try:
-            # Contar backups por tipo e status
-            backup_stats = defaultdict(lambda: defaultdict(int))
-
-            for job in self.backup_jobs.values():
-                backup_stats[job.type.value][job.status.value] += 1
+            # Snapshot sob lock: o worker de backup altera o cache em paralelo
+            with self._jobs_lock:
+                stats = dict(self._backup_stats)
+                jobs = list(self.backup_jobs.values())
+                last = self._last_backup_ref
+
+            # Contar backups por tipo e status (mantido incrementalmente)
+            backup_stats = {}
+            for (job_type, status), count in stats.items():
+                if count > 0:
+                    backup_stats.setdefault(job_type, {})[status] = count
 
             # Último backup
             last_backup = None
-            if self.backup_jobs:
-                last_backup = max(self.backup_jobs.values(),
-                                key=lambda x: x.start_time)
-                last_backup = asdict(last_backup)
-
-            # Estatísticas de espaço
-            total_size = 0
-            for job in self.backup_jobs.values():
-                if os.path.exists(job.target_path):
-                    total_size += os.path.getsize(job.target_path)
+            if last:
+                # Cópia rasa: sem deep-copy recursivo de source_paths/metadata
+                last_backup = {f.name: getattr(last, f.name) for f in fields(last)}
+
+            # Estatísticas de espaço (tamanho persistido no job; stat só como fallback)
+            total_size = sum(
+                job.compressed_size or self._get_target_size(job.target_path)
+                for job in jobs
+            )
 
             return {
-                'total_backups': len(self.backup_jobs),
+                'total_backups': len(jobs),
                 'last_backup': last_backup,
-                'backup_stats': dict(backup_stats),
+                'backup_stats': backup_stats,
                 'total_size_mb': round(total_size / (1024 * 1024), 2),
                 'scheduler_active': self.scheduler_thread is not None,
                 'next_scheduled': self._get_next_scheduled_backup()
@@ -992,22 +1219,39 @@ class AutomaticBackupSystem:
             logger.error(f"Erro ao obter status: {e}")
             return {}
 
-    def _get_next_scheduled_backup(self) -> Optional[str]:
-        """Obter próximo backup agendado"""
+    def _get_target_size(self, target_path: str) -> int:
+        """Obter tamanho do arquivo de backup (memoizado por path)"""
+        size = self._target_size_cache.get(target_path)
+        if size is None:
+            try:
+                size = os.stat(target_path).st_size
+            except OSError:
+                size = 0
+            self._target_size_cache[target_path] = size
+        return size
+
+    def _update_next_run(self):
+        """Atualizar cache do próximo backup agendado"""
         try:
             next_job = schedule.next_run()
-            return next_job.isoformat() if next_job else None
+            self._next_run_iso = next_job.isoformat() if next_job else None
         except Exception:
-            return None
+            self._next_run_iso = None
+
+    def _get_next_scheduled_backup(self) -> Optional[str]:
+        """Obter próximo backup agendado"""
+        return self._next_run_iso
 
     def create_emergency_backup(self):
         """Criar backup de emergência"""
         try:
             logger.warning("Criando backup de emergência")
-            backup_id = self.create_full_backup("Backup de emergência")
+            # retention_class='emergency' mantém o backup fora da rotação de cleanup
+            backup_id = self.create_full_backup("Backup de emergência",
+                                                retention_class='emergency')
 
-            # Manter este backup por mais tempo
-            # (Implementação seria marcar no metadata)
+            # Acordar o scheduler: despacha jobs já vencidos e atualiza próximo agendamento
+            self._wake_event.set()
 
             return backup_id
 
@@ -6,30 +6,156 @@ Características: Leader traders, followers, performance tracking, alocação di
 """
 
 import asyncio
-import hashlib
+import heapq
+import itertools
 import json
 import logging
-import math
 import os
 import secrets
 import sqlite3
 import threading
 import time
-import uuid
-from collections import defaultdict, deque
-from dataclasses import asdict, dataclass
+from collections import ChainMap, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import numpy as np
-import pandas as pd
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback sem Numba: executa a função em NumPy puro"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _json_dumps(obj: Any) -> str:
+    """Serializar para JSON (orjson quando disponível)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj)
+
+def _json_loads(data: str) -> Any:
+    """Desserializar JSON (orjson quando disponível)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+@njit(cache=True, fastmath=True)
+def _copy_and_pnl_kernel(allocation, allocation_pct, risk_mult, position_size_limit,
+                         trade_amount, price, side_sign, price_mult, pnl_mult):
+    """Kernel de amounts copiados e PnL simulado (compilado com Numba quando disponível)"""
+    # Amount base da alocação, reduzido se o trade excede o limite de posição
+    base_amount = allocation
+    trade_value = trade_amount * price
+    if trade_value > 0:
+        base_amount = allocation * np.minimum(allocation * position_size_limit / trade_value, 1.0)
+
+    # Aplicar percentual de alocação e multiplicadores de risco;
+    # máximo 50% da alocação por trade
+    copy_amounts = np.minimum(base_amount * allocation_pct * risk_mult, allocation * 0.5)
+
+    # PnL simulado a partir da variação de preço, com sinal do side
+    pnls = (price * price_mult - price) * copy_amounts * side_sign * pnl_mult
+    return copy_amounts, pnls
+
+def _leader_metrics_numpy(pnls, returns, initial_capital):
+    """Métricas do leader com reduções NumPy vetorizadas"""
+    wins = pnls > 0
+    total_pnl = pnls.sum()
+    gross_profit = pnls[wins].sum()
+    equity = initial_capital + np.cumsum(pnls)
+    # Max drawdown: queda relativa da equity face ao pico (inclui o capital inicial)
+    peak = np.maximum(np.maximum.accumulate(equity), initial_capital)
+    # Perdas brutas = lucros brutos - total (sem segunda redução filtrada)
+    return (int(np.count_nonzero(wins)), gross_profit, gross_profit - total_pnl, total_pnl,
+            float((1.0 - equity / peak).max()), returns.mean(), returns.std())
+
+@njit(cache=True, fastmath=True)
+def _leader_metrics_kernel(pnls, returns, initial_capital):
+    """Métricas do leader numa única passagem sobre pnls/returns (Numba)"""
+    n = pnls.size
+    wins = 0
+    gross_profit = 0.0
+    gross_loss = 0.0
+    equity = initial_capital
+    peak = initial_capital
+    max_drawdown = 0.0
+    sum_ret = 0.0
+    sum_sq = 0.0
+
+    for i in range(n):
+        p = pnls[i]
+        if p > 0:
+            wins += 1
+            gross_profit += p
+        else:
+            gross_loss -= p
+
+        # Max drawdown: queda relativa da equity face ao pico (inclui o capital inicial)
+        equity += p
+        if equity > peak:
+            peak = equity
+        drawdown = 1.0 - equity / peak
+        if drawdown > max_drawdown:
+            max_drawdown = drawdown
+
+        r = returns[i]
+        sum_ret += r
+        sum_sq += r * r
+
+    mean = sum_ret / n
+    variance = max(sum_sq / n - mean * mean, 0.0)
+    return (wins, gross_profit, gross_loss, equity - initial_capital,
+            max_drawdown, mean, np.sqrt(variance))
+
+def _leader_metrics_batch(pnls, returns, lengths, initial_capital):
+    """Métricas de vários leaders de uma vez (trades em segmentos contíguos)"""
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    segment = np.repeat(np.arange(lengths.size), lengths)
+
+    wins_mask = pnls > 0
+    wins = np.add.reduceat(wins_mask.astype(np.int64), offsets)
+    gross_profit = np.add.reduceat(np.where(wins_mask, pnls, 0.0), offsets)
+    total_pnl = np.add.reduceat(pnls, offsets)
+    gross_loss = gross_profit - total_pnl
+
+    mean = np.add.reduceat(returns, offsets) / lengths
+    std = np.sqrt(np.maximum(np.add.reduceat(returns * returns, offsets) / lengths - mean * mean, 0.0))
+
+    # Equity por segmento: cumsum global menos o acumulado antes do segmento
+    cum = np.cumsum(pnls)
+    equity = initial_capital + cum - np.concatenate(([0.0], cum))[offsets][segment]
+
+    # Pico por segmento: cada segmento é deslocado acima de todos os anteriores,
+    # de modo que um único maximum.accumulate recomeça em cada leader
+    shift = (equity.max() - equity.min() + 1.0) * segment
+    peak = np.maximum(np.maximum.accumulate(equity + shift) - shift, initial_capital)
+    max_drawdown = np.maximum(np.maximum.reduceat(1.0 - equity / peak, offsets), 0.0)
+
+    return wins, gross_profit, gross_loss, total_pnl, max_drawdown, mean, std
+
+# Sem Numba o laço escalar seria mais lento que as reduções NumPy
+_leader_metrics = _leader_metrics_kernel if NUMBA_AVAILABLE else _leader_metrics_numpy
+
 class CopyTradingStatus(Enum):
     """Status do copy trading"""
     INACTIVE = "inactive"
@@ -56,7 +182,7 @@ class PerformanceMetric(Enum):
     CONSISTENCY = "consistency"
     TRADES_COUNT = "trades_count"
 
-@dataclass
+@dataclass(slots=True)
 class LeaderTrader:
     """Trader leader (quem pode ser copiado)"""
     id: str
@@ -73,8 +199,16 @@ class LeaderTrader:
     last_active: str
     settings: Dict[str, Any]
     stats: Dict[str, Any]
+    created_ts: float = field(default=0.0, repr=False, compare=False)
+    # Performance memorizada: (timestamp, métricas); não persistida
+    cached_performance: Optional[Tuple[float, Dict[str, Any]]] = field(default=None, repr=False, compare=False)
 
-@dataclass
+    def __post_init__(self):
+        # Timestamp de criação pré-calculado (evita parse ISO nos filtros)
+        if not self.created_ts:
+            self.created_ts = datetime.fromisoformat(self.created_at).timestamp()
+
+@dataclass(slots=True)
 class Follower:
     """Follower (quem copia trades)"""
     id: str
@@ -91,7 +225,7 @@ class Follower:
     last_sync: str
     performance: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True)
 class CopyTrade:
     """Trade copiado"""
     id: str
@@ -108,10 +242,184 @@ class CopyTrade:
     created_at: str
     executed_at: str
     error_message: Optional[str] = None
+    created_ts: int = 0  # epoch (s) de created_at
+
+@dataclass(slots=True)
+class SimTrade:
+    """Trade (simulado) de um leader usado nas métricas de performance"""
+    id: str
+    pnl: float
+    return_: float
+    timestamp: datetime
+
+# Schema de copy trading (tabelas + índices), aplicado numa única transação
+COPY_TRADING_DDL = '''
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS copy_leaders (
+    id TEXT PRIMARY KEY,
+    username TEXT UNIQUE,
+    display_name TEXT,
+    bio TEXT,
+    avatar_url TEXT,
+    level TEXT,
+    total_followers INTEGER,
+    total_aum REAL,
+    performance_score REAL,
+    verified BOOLEAN,
+    created_at TEXT,
+    last_active TEXT,
+    settings TEXT,
+    stats TEXT
+);
+
+CREATE TABLE IF NOT EXISTS copy_followers (
+    id TEXT PRIMARY KEY,
+    leader_id TEXT,
+    user_id TEXT,
+    allocation_amount REAL,
+    allocation_percentage REAL,
+    risk_level TEXT,
+    auto_invest BOOLEAN,
+    stop_loss_percentage REAL,
+    max_drawdown_limit REAL,
+    created_at TEXT,
+    status TEXT,
+    last_sync TEXT,
+    performance TEXT,
+    FOREIGN KEY (leader_id) REFERENCES copy_leaders (id)
+);
+
+CREATE TABLE IF NOT EXISTS copy_trades (
+    id TEXT PRIMARY KEY,
+    leader_id TEXT,
+    follower_id TEXT,
+    original_trade_id TEXT,
+    symbol TEXT,
+    side TEXT,
+    amount REAL,
+    price REAL,
+    executed_price REAL,
+    copy_percentage REAL,
+    status TEXT,
+    created_at TEXT,
+    executed_at TEXT,
+    error_message TEXT,
+    created_ts INTEGER,  -- epoch (s) de created_at, usado na limpeza
+    FOREIGN KEY (leader_id) REFERENCES copy_leaders (id),
+    FOREIGN KEY (follower_id) REFERENCES copy_followers (id)
+);
+
+CREATE TABLE IF NOT EXISTS copy_performance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trader_id TEXT,
+    trader_type TEXT,  -- leader ou follower
+    date TEXT,
+    total_value REAL,
+    pnl REAL,
+    return_percentage REAL,
+    positions_count INTEGER,
+    trades_count INTEGER,
+    aum REAL,
+    metrics TEXT,
+    created_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_followers_leader ON copy_followers(leader_id, status);
+CREATE INDEX IF NOT EXISTS idx_followers_status ON copy_followers(status);
+CREATE INDEX IF NOT EXISTS idx_trades_leader ON copy_trades(leader_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_trades_created_ts ON copy_trades(created_ts);
+
+COMMIT;
+'''
+
+# Objetos criados por COPY_TRADING_DDL (verificação rápida do schema)
+COPY_TRADING_SCHEMA_OBJECTS = (
+    'copy_leaders', 'copy_followers', 'copy_trades', 'copy_performance',
+    'idx_followers_leader', 'idx_followers_status', 'idx_trades_leader',
+    'idx_trades_created_ts'
+)
+
+# Ciclos de sincronização entre checkpoints do WAL (autocheckpoint desativado)
+WAL_CHECKPOINT_EVERY = 10
+
+# Capital inicial assumido nas métricas dos leaders
+LEADER_INITIAL_CAPITAL = 10000.0
+
+# Validade (segundos) da performance calculada de cada leader
+PERFORMANCE_CACHE_TTL = 300
+
+# Intervalo (segundos) do flusher write-behind de leaders/followers
+WRITE_BEHIND_FLUSH_SECONDS = 1.0
+
+# Followers carregados no arranque (os restantes são lidos sob demanda)
+FOLLOWER_COLUMNS = '''
+    id, leader_id, user_id, allocation_amount, allocation_percentage,
+    risk_level, auto_invest, stop_loss_percentage, max_drawdown_limit,
+    created_at, status, last_sync, performance
+'''
+LOAD_LIVE_FOLLOWERS_SQL = f"SELECT {FOLLOWER_COLUMNS} FROM copy_followers WHERE status IN ('active', 'paused')"
+LOAD_FOLLOWER_SQL = f"SELECT {FOLLOWER_COLUMNS} FROM copy_followers WHERE id = ?"
+
+# Statements de escrita reutilizados (mesma string -> cache de statements do sqlite3)
+SAVE_LEADER_SQL = '''
+    INSERT OR REPLACE INTO copy_leaders
+    (id, username, display_name, bio, avatar_url, level,
+     total_followers, total_aum, performance_score, verified,
+     created_at, last_active, settings, stats)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SAVE_FOLLOWER_SQL = '''
+    INSERT OR REPLACE INTO copy_followers
+    (id, leader_id, user_id, allocation_amount, allocation_percentage,
+     risk_level, auto_invest, stop_loss_percentage, max_drawdown_limit,
+     created_at, status, last_sync, performance)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SAVE_COPY_TRADE_SQL = '''
+    INSERT OR REPLACE INTO copy_trades
+    (id, leader_id, follower_id, original_trade_id, symbol, side,
+     amount, price, executed_price, copy_percentage, status,
+     created_at, executed_at, error_message, created_ts)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Atualizações parciais (só as colunas que mudam em cada ciclo)
+UPDATE_LEADER_PERFORMANCE_SQL = '''
+    UPDATE copy_leaders SET performance_score = ?, stats = ?, last_active = ? WHERE id = ?
+'''
+
+UPDATE_FOLLOWER_STATUS_SQL = '''
+    UPDATE copy_followers SET status = ? WHERE id = ?
+'''
+
+UPDATE_FOLLOWER_PERFORMANCE_SQL = '''
+    UPDATE copy_followers SET performance = ?, last_sync = ? WHERE id = ?
+'''
+
+SAVE_PERFORMANCE_SQL = '''
+    INSERT INTO copy_performance
+    (trader_id, trader_type, date, total_value, pnl, return_percentage,
+     positions_count, trades_count, aum, metrics, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
 
 class CopyTradingSystem:
     """Sistema de copy trading completo"""
 
+    # Pesos por métrica do leaderboard
+    _METRIC_WEIGHTS = {
+        PerformanceMetric.TOTAL_RETURN: 1.0,
+        PerformanceMetric.SHARPE_RATIO: 0.8,
+        PerformanceMetric.WIN_RATE: 0.6,
+        PerformanceMetric.MAX_DRAWDOWN: 0.9,  # Menor é melhor
+        PerformanceMetric.PROFIT_FACTOR: 0.7,
+        PerformanceMetric.CONSISTENCY: 0.5,
+        PerformanceMetric.TRADES_COUNT: 0.3
+    }
+
     def __init__(self, db_path: str = 'user_data/freqtrade3.db'):
         self.db_path = db_path
         self.copy_data_dir = 'copy_data'
@@ -123,15 +431,45 @@ class CopyTradingSystem:
 
         # Estado interno
         self.leaders = {}
+        self._username_index = {}  # username -> leader_id
         self.followers = {}
+        self._followers_by_leader = defaultdict(set)          # leader_id -> {follower_id}
+        self._active_followers_by_leader = defaultdict(dict)  # leader_id -> {follower_id: Follower}
+        self._follower_count_by_leader = defaultdict(int)     # leader_id -> followers (todos os status)
         self.copy_trades = {}
-        self.performance_cache = {}
+        self._lb_cache = {}  # metric -> (built_at, scores ndarray, linhas)
+        # Write-behind: IDs alterados em memória, gravados em lote pelo flusher
+        self._dirty_leaders = set()
+        self._dirty_followers = set()
+        self._dirty_lock = threading.Lock()
+        self._rng = np.random.default_rng()
+        self._rng_lock = threading.Lock()  # Generator não é thread-safe (sync usa workers)
+        # IDs: prefixo aleatório por processo + contador monotónico
+        self._id_prefix = secrets.token_hex(8)
+        self._id_seq = itertools.count()
         self.sync_active = False
         self.sync_thread = None
 
+        # Conexão persistente (autocommit; transações explícitas em lote)
+        self._conn = None
+        self._db_lock = threading.RLock()
+
         # Configurações
         self.config = self._load_config()
 
+        # Vista plana das configurações usadas no hot path (evitar dicts aninhados)
+        self.cfg = SimpleNamespace(
+            interval=self.config['sync']['interval_seconds'],
+            max_concurrent=self.config['sync']['max_concurrent_syncs'],
+            pos_limit=float(self.config['risk_management']['position_size_limit']),
+            stop_loss=self.config['risk_management']['default_stop_loss'],
+            min_alloc=self.config['copy_trading']['min_allocation'],
+            max_followers=self.config['copy_trading']['max_leader_followers'],
+            max_risk_allocation=self.config['copy_trading']['max_risk_allocation'],
+            risk_mult_calc={'low': 0.5, 'medium': 1.0, 'high': 1.5},
+            risk_mult_copy={'low': 0.7, 'medium': 1.0, 'high': 1.3}
+        )
+
         # Inicializar sistema
         self._init_copy_trading_system()
 
@@ -152,95 +490,41 @@ class CopyTradingSystem:
     def _init_database(self):
         """Inicializar base de dados de copy trading"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Tabela de leaders
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS copy_leaders (
-                    id TEXT PRIMARY KEY,
-                    username TEXT UNIQUE,
-                    display_name TEXT,
-                    bio TEXT,
-                    avatar_url TEXT,
-                    level TEXT,
-                    total_followers INTEGER,
-                    total_aum REAL,
-                    performance_score REAL,
-                    verified BOOLEAN,
-                    created_at TEXT,
-                    last_active TEXT,
-                    settings TEXT,
-                    stats TEXT
-                )
-            ''')
-
-            # Tabela de followers
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS copy_followers (
-                    id TEXT PRIMARY KEY,
-                    leader_id TEXT,
-                    user_id TEXT,
-                    allocation_amount REAL,
-                    allocation_percentage REAL,
-                    risk_level TEXT,
-                    auto_invest BOOLEAN,
-                    stop_loss_percentage REAL,
-                    max_drawdown_limit REAL,
-                    created_at TEXT,
-                    status TEXT,
-                    last_sync TEXT,
-                    performance TEXT,
-                    FOREIGN KEY (leader_id) REFERENCES copy_leaders (id)
-                )
-            ''')
-
-            # Tabela de copy trades
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS copy_trades (
-                    id TEXT PRIMARY KEY,
-                    leader_id TEXT,
-                    follower_id TEXT,
-                    original_trade_id TEXT,
-                    symbol TEXT,
-                    side TEXT,
-                    amount REAL,
-                    price REAL,
-                    executed_price REAL,
-                    copy_percentage REAL,
-                    status TEXT,
-                    created_at TEXT,
-                    executed_at TEXT,
-                    error_message TEXT,
-                    FOREIGN KEY (leader_id) REFERENCES copy_leaders (id),
-                    FOREIGN KEY (follower_id) REFERENCES copy_followers (id)
-                )
-            ''')
-
-            # Tabela de performance
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS copy_performance (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    trader_id TEXT,
-                    trader_type TEXT,  -- leader ou follower
-                    date TEXT,
-                    total_value REAL,
-                    pnl REAL,
-                    return_percentage REAL,
-                    positions_count INTEGER,
-                    trades_count INTEGER,
-                    aum REAL,
-                    metrics TEXT,
-                    created_at TEXT
-                )
-            ''')
-
-            conn.commit()
-            conn.close()
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                         isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('PRAGMA temp_store=MEMORY')
+            # Checkpoints feitos pelo loop de sincronização, fora do caminho das escritas
+            if self.config['sync']['enabled']:
+                self._conn.execute('PRAGMA wal_autocheckpoint=0')
+
+            # Schema completo já existe: evitar reexecutar o DDL
+            placeholders = ', '.join('?' * len(COPY_TRADING_SCHEMA_OBJECTS))
+            existing = self._conn.execute(
+                f'SELECT COUNT(*) FROM sqlite_master WHERE name IN ({placeholders})',
+                COPY_TRADING_SCHEMA_OBJECTS
+            ).fetchone()[0]
+
+            if existing < len(COPY_TRADING_SCHEMA_OBJECTS):
+                self._migrate_copy_trades()
+                self._conn.executescript(COPY_TRADING_DDL)
 
         except Exception as e:
             print(f"❌ Erro ao inicializar database de copy trading: {e}")
 
+    def _migrate_copy_trades(self):
+        """Adicionar created_ts (epoch) a bases antigas de copy_trades"""
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(copy_trades)')]
+        if columns and 'created_ts' not in columns:
+            self._conn.executescript('''
+                BEGIN;
+                ALTER TABLE copy_trades ADD COLUMN created_ts INTEGER;
+                UPDATE copy_trades SET created_ts = CAST(strftime('%s', created_at, 'utc') AS INTEGER);
+                DROP INDEX IF EXISTS idx_trades_created;
+                COMMIT;
+            ''')
+
     def _load_config(self) -> Dict[str, Any]:
         """Carregar configurações"""
         default_config = {
@@ -300,7 +584,8 @@ class CopyTradingSystem:
             if self._get_leader_by_username(username):
                 raise ValueError("Username já existe")
 
-            leader_id = str(uuid.uuid4())
+            leader_id = self._new_id()
+            now_iso = datetime.now().isoformat()
 
             leader = LeaderTrader(
                 id=leader_id,
@@ -313,8 +598,8 @@ class CopyTradingSystem:
                 total_aum=0.0,
                 performance_score=0.0,
                 verified=False,
-                created_at=datetime.now().isoformat(),
-                last_active=datetime.now().isoformat(),
+                created_at=now_iso,
+                last_active=now_iso,
                 settings={
                     'min_allocation': self.config['copy_trading']['min_allocation'],
                     'max_followers': self.config['copy_trading']['max_leader_followers'],
@@ -331,6 +616,7 @@ class CopyTradingSystem:
 
             # Salvar
             self.leaders[leader_id] = leader
+            self._username_index[username] = leader_id
             self._save_leader(leader)
 
             logger.info(f"Leader trader registrado: {username} ({leader_id})")
@@ -350,15 +636,16 @@ class CopyTradingSystem:
                 raise ValueError("Leader não encontrado")
 
             # Validar alocação
-            if allocation_amount < self.config['copy_trading']['min_allocation']:
-                raise ValueError(f"Alocação mínima: ${self.config['copy_trading']['min_allocation']}")
+            if allocation_amount < self.cfg.min_alloc:
+                raise ValueError(f"Alocação mínima: ${self.cfg.min_alloc}")
 
             # Verificar limites
-            follower_count = len([f for f in self.followers.values() if f.leader_id == leader_id])
-            if follower_count >= leader.settings.get('max_followers', self.config['copy_trading']['max_leader_followers']):
+            follower_count = self._follower_count_by_leader[leader_id]
+            if follower_count >= leader.settings.get('max_followers', self.cfg.max_followers):
                 raise ValueError("Leader atingiu limite de followers")
 
-            follower_id = str(uuid.uuid4())
+            follower_id = self._new_id()
+            now_iso = datetime.now().isoformat()
 
             follower = Follower(
                 id=follower_id,
@@ -368,17 +655,17 @@ class CopyTradingSystem:
                 allocation_percentage=0.0,  # Será calculado
                 risk_level=risk_level,
                 auto_invest=auto_invest,
-                stop_loss_percentage=self.config['risk_management']['default_stop_loss'],
-                max_drawdown_limit=self.config['copy_trading']['max_risk_allocation'],
-                created_at=datetime.now().isoformat(),
+                stop_loss_percentage=self.cfg.stop_loss,
+                max_drawdown_limit=self.cfg.max_risk_allocation,
+                created_at=now_iso,
                 status=CopyTradingStatus.ACTIVE,
-                last_sync=datetime.now().isoformat(),
+                last_sync=now_iso,
                 performance={
                     'total_pnl': 0.0,
                     'total_return': 0.0,
                     'win_rate': 0.0,
                     'trades_count': 0,
-                    'started_at': datetime.now().isoformat()
+                    'started_at': now_iso
                 }
             )
 
@@ -387,12 +674,14 @@ class CopyTradingSystem:
 
             # Salvar
             self.followers[follower_id] = follower
+            self._follower_count_by_leader[leader_id] += 1
+            self._index_follower(follower)
             self._save_follower(follower)
 
-            # Atualizar stats do leader
+            # Atualizar stats do leader (gravado em lote)
             leader.total_followers += 1
             leader.total_aum += allocation_amount
-            self._save_leader(leader)
+            self._mark_dirty(leader=leader)
 
             logger.info(f"Follower iniciado: {follower_id} copiando {leader_id}")
             return follower_id
@@ -401,93 +690,177 @@ class CopyTradingSystem:
             logger.error(f"Erro ao iniciar copy: {e}")
             raise
 
+    def _index_follower(self, follower: Follower):
+        """Atualizar índices leader -> followers após inclusão ou mudança de status"""
+        self._followers_by_leader[follower.leader_id].add(follower.id)
+
+        active = self._active_followers_by_leader[follower.leader_id]
+        if follower.status == CopyTradingStatus.ACTIVE:
+            active[follower.id] = follower
+        else:
+            active.pop(follower.id, None)
+
     def _calculate_allocation_percentage(self, follower: Follower) -> float:
         """Calcular percentual de alocação baseado no risco"""
-        risk_multipliers = {
-            'low': 0.5,
-            'medium': 1.0,
-            'high': 1.5
-        }
-
         base_percentage = follower.allocation_amount / 10000  # Assumir portfólio base de $10k
-        risk_multiplier = risk_multipliers.get(follower.risk_level, 1.0)
+        risk_multiplier = self.cfg.risk_mult_calc.get(follower.risk_level, 1.0)
 
         return min(base_percentage * risk_multiplier, follower.max_drawdown_limit)
 
+    def _new_id(self) -> str:
+        """Gerar ID único (mais barato que uuid4)"""
+        return f"{self._id_prefix}{next(self._id_seq):x}"
+
     def _get_leader(self, leader_id: str) -> Optional[LeaderTrader]:
         """Obter leader por ID"""
         return self.leaders.get(leader_id)
 
     def _get_leader_by_username(self, username: str) -> Optional[LeaderTrader]:
         """Obter leader por username"""
-        for leader in self.leaders.values():
-            if leader.username == username:
-                return leader
-        return None
+        leader_id = self._username_index.get(username)
+        return self.leaders.get(leader_id) if leader_id else None
+
+    @contextmanager
+    def _transaction(self):
+        """Executar escritas numa única transação (BEGIN IMMEDIATE/COMMIT)"""
+        with self._db_lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
 
     def _save_leader(self, leader: LeaderTrader):
         """Salvar leader no banco"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT OR REPLACE INTO copy_leaders
-                (id, username, display_name, bio, avatar_url, level,
-                 total_followers, total_aum, performance_score, verified,
-                 created_at, last_active, settings, stats)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                leader.id, leader.username, leader.display_name, leader.bio,
-                leader.avatar_url, leader.level.value, leader.total_followers,
-                leader.total_aum, leader.performance_score, leader.verified,
-                leader.created_at, leader.last_active, json.dumps(leader.settings),
-                json.dumps(leader.stats)
-            ))
-
-            conn.commit()
-            conn.close()
+            with self._db_lock:
+                self._conn.execute(SAVE_LEADER_SQL, self._leader_row(leader))
+            self._invalidate_leaderboard()
 
         except Exception as e:
             logger.error(f"Erro ao salvar leader: {e}")
 
+    def _update_leader_performance(self, leader: LeaderTrader):
+        """Atualizar apenas performance/stats/last_active do leader"""
+        try:
+            with self._db_lock:
+                self._conn.execute(UPDATE_LEADER_PERFORMANCE_SQL, (
+                    leader.performance_score, _json_dumps(leader.stats),
+                    leader.last_active, leader.id
+                ))
+            self._invalidate_leaderboard()
+
+        except Exception as e:
+            logger.error(f"Erro ao atualizar performance do leader: {e}")
+
+    def _update_follower_performance_rows(self, followers: List[Follower]):
+        """Atualizar apenas performance/last_sync de vários followers"""
+        try:
+            rows = [(_json_dumps(follower.performance), follower.last_sync, follower.id)
+                    for follower in followers]
+            with self._transaction() as conn:
+                conn.executemany(UPDATE_FOLLOWER_PERFORMANCE_SQL, rows)
+
+        except Exception as e:
+            logger.error(f"Erro ao atualizar performance dos followers: {e}")
+
+    def _mark_dirty(self, leader: Optional[LeaderTrader] = None,
+                    follower: Optional[Follower] = None):
+        """Marcar leader/follower para gravação em lote (imediata sem sincronização)"""
+        with self._dirty_lock:
+            if leader:
+                self._dirty_leaders.add(leader.id)
+            if follower:
+                self._dirty_followers.add(follower.id)
+
+        if leader:
+            self._invalidate_leaderboard()
+
+        if not self.sync_active:
+            self._flush_dirty()
+
+    def _flush_dirty(self):
+        """Gravar numa transação todos os leaders/followers marcados"""
+        with self._dirty_lock:
+            leader_ids, self._dirty_leaders = self._dirty_leaders, set()
+            follower_ids, self._dirty_followers = self._dirty_followers, set()
+
+        if not leader_ids and not follower_ids:
+            return
+
+        try:
+            leader_rows = [self._leader_row(self.leaders[i]) for i in leader_ids if i in self.leaders]
+            follower_rows = [self._follower_row(self.followers[i]) for i in follower_ids
+                             if i in self.followers]
+
+            with self._transaction() as conn:
+                if leader_rows:
+                    conn.executemany(SAVE_LEADER_SQL, leader_rows)
+                if follower_rows:
+                    conn.executemany(SAVE_FOLLOWER_SQL, follower_rows)
+
+        except Exception as e:
+            logger.error(f"Erro ao gravar alterações pendentes: {e}")
+            # Manter marcados para a próxima tentativa
+            with self._dirty_lock:
+                self._dirty_leaders |= leader_ids
+                self._dirty_followers |= follower_ids
+
+    def _update_follower_statuses(self, followers: List[Follower]):
+        """Atualizar apenas o status de vários followers"""
+        try:
+            rows = [(follower.status.value, follower.id) for follower in followers]
+            with self._transaction() as conn:
+                conn.executemany(UPDATE_FOLLOWER_STATUS_SQL, rows)
+
+        except Exception as e:
+            logger.error(f"Erro ao atualizar status dos followers: {e}")
+
     def _save_follower(self, follower: Follower):
         """Salvar follower no banco"""
+        self._save_followers_bulk([follower])
+
+    def _save_followers_bulk(self, followers: List[Follower]):
+        """Salvar vários followers numa única transação"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT OR REPLACE INTO copy_followers
-                (id, leader_id, user_id, allocation_amount, allocation_percentage,
-                 risk_level, auto_invest, stop_loss_percentage, max_drawdown_limit,
-                 created_at, status, last_sync, performance)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                follower.id, follower.leader_id, follower.user_id,
-                follower.allocation_amount, follower.allocation_percentage,
-                follower.risk_level, follower.auto_invest, follower.stop_loss_percentage,
-                follower.max_drawdown_limit, follower.created_at, follower.status.value,
-                follower.last_sync, json.dumps(follower.performance)
-            ))
-
-            conn.commit()
-            conn.close()
+            rows = [self._follower_row(follower) for follower in followers]
+            with self._transaction() as conn:
+                conn.executemany(SAVE_FOLLOWER_SQL, rows)
 
         except Exception as e:
             logger.error(f"Erro ao salvar follower: {e}")
 
+    def _leader_row(self, leader: LeaderTrader) -> Tuple:
+        """Converter leader em tupla para o banco"""
+        return (
+            leader.id, leader.username, leader.display_name, leader.bio,
+            leader.avatar_url, leader.level.value, leader.total_followers,
+            leader.total_aum, leader.performance_score, leader.verified,
+            leader.created_at, leader.last_active, _json_dumps(leader.settings),
+            _json_dumps(leader.stats)
+        )
+
+    def _follower_row(self, follower: Follower) -> Tuple:
+        """Converter follower em tupla para o banco"""
+        return (
+            follower.id, follower.leader_id, follower.user_id,
+            follower.allocation_amount, follower.allocation_percentage,
+            follower.risk_level, follower.auto_invest, follower.stop_loss_percentage,
+            follower.max_drawdown_limit, follower.created_at, follower.status.value,
+            follower.last_sync, _json_dumps(follower.performance)
+        )
+
     def _load_leaders(self):
         """Carregar leaders do banco"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._db_lock:
+                rows = self._conn.execute('''
+                    SELECT * FROM copy_leaders
+                ''').fetchall()
 
-            cursor.execute('''
-                SELECT * FROM copy_leaders
-            ''')
-
-            for row in cursor.fetchall():
+            for row in rows:
                 leader = LeaderTrader(
                     id=row[0],
                     username=row[1],
@@ -501,81 +874,126 @@ class CopyTradingSystem:
                     verified=row[9],
                     created_at=row[10],
                     last_active=row[11],
-                    settings=json.loads(row[12]) if row[12] else {},
-                    stats=json.loads(row[13]) if row[13] else {}
+                    settings=_json_loads(row[12]) if row[12] else {},
+                    stats=_json_loads(row[13]) if row[13] else {}
                 )
 
                 self.leaders[leader.id] = leader
+                self._username_index[leader.username] = leader.id
 
-            conn.close()
             print(f"📊 {len(self.leaders)} leaders carregados")
 
         except Exception as e:
             logger.error(f"Erro ao carregar leaders: {e}")
 
     def _load_followers(self):
-        """Carregar followers do banco"""
+        """Carregar followers ativos/pausados do banco (em blocos)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._db_lock:
+                cursor = self._conn.execute(LOAD_LIVE_FOLLOWERS_SQL)
+                cursor.arraysize = 1000
 
-            cursor.execute('''
-                SELECT * FROM copy_followers
-            ''')
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
 
-            for row in cursor.fetchall():
-                follower = Follower(
-                    id=row[0],
-                    leader_id=row[1],
-                    user_id=row[2],
-                    allocation_amount=row[3],
-                    allocation_percentage=row[4],
-                    risk_level=row[5],
-                    auto_invest=row[6],
-                    stop_loss_percentage=row[7],
-                    max_drawdown_limit=row[8],
-                    created_at=row[9],
-                    status=CopyTradingStatus(row[10]),
-                    last_sync=row[11],
-                    performance=json.loads(row[12]) if row[12] else {}
-                )
+                    for row in rows:
+                        follower = self._row_to_follower(row)
+                        self.followers[follower.id] = follower
+                        self._index_follower(follower)
 
-                self.followers[follower.id] = follower
+                # Contagem por leader inclui followers não carregados
+                for leader_id, count in self._conn.execute(
+                        'SELECT leader_id, COUNT(*) FROM copy_followers GROUP BY leader_id'):
+                    self._follower_count_by_leader[leader_id] = count
 
-            conn.close()
             print(f"👥 {len(self.followers)} followers carregados")
 
         except Exception as e:
             logger.error(f"Erro ao carregar followers: {e}")
 
+    def _row_to_follower(self, row) -> Follower:
+        """Converter linha de copy_followers em Follower"""
+        return Follower(
+            id=row[0],
+            leader_id=row[1],
+            user_id=row[2],
+            allocation_amount=row[3],
+            allocation_percentage=row[4],
+            risk_level=row[5],
+            auto_invest=row[6],
+            stop_loss_percentage=row[7],
+            max_drawdown_limit=row[8],
+            created_at=row[9],
+            status=CopyTradingStatus(row[10]),
+            last_sync=row[11],
+            performance=_json_loads(row[12]) if row[12] else {}
+        )
+
+    def _get_follower(self, follower_id: str) -> Optional[Follower]:
+        """Obter follower por ID (inativos são carregados sob demanda)"""
+        follower = self.followers.get(follower_id)
+        if follower:
+            return follower
+
+        try:
+            with self._db_lock:
+                row = self._conn.execute(LOAD_FOLLOWER_SQL, (follower_id,)).fetchone()
+            if not row:
+                return None
+
+            follower = self._row_to_follower(row)
+            self.followers[follower.id] = follower
+            self._index_follower(follower)
+            return follower
+
+        except Exception as e:
+            logger.error(f"Erro ao carregar follower {follower_id}: {e}")
+            return None
+
     def sync_trade_execution(self, leader_id: str, trade_data: Dict[str, Any]) -> List[CopyTrade]:
         """Sincronizar execução de trade para followers"""
         try:
             if not self.sync_active:
                 return []
 
-            # Obter followers ativos do leader
-            active_followers = [
-                f for f in self.followers.values()
-                if f.leader_id == leader_id and f.status == CopyTradingStatus.ACTIVE
-            ]
+            # Novo trade do leader: performance em cache deixa de ser válida
+            leader = self.leaders.get(leader_id)
+            if leader:
+                leader.cached_performance = None
+            self._invalidate_leaderboard()
+
+            # Obter followers ativos do leader (índice invertido)
+            active_followers = list(self._active_followers_by_leader.get(leader_id, {}).values())
 
             if not active_followers:
                 return []
 
+            # Amounts, PnL e slippage simulados de todos os followers numa só passagem
+            copy_amounts, pnls = self._calculate_copy_batch(active_followers, trade_data)
+            with self._rng_lock:
+                slippage = self._rng.uniform(0.999, 1.001, len(active_followers))
+            executed_prices = trade_data.get('price', 0.0) * slippage
+
+            # Um único timestamp para todo o lote
+            now = datetime.now()
+            now_iso = now.isoformat()
+            now_ts = int(now.timestamp())
+
             copied_trades = []
+            updated_followers = []
 
-            for follower in active_followers:
+            for i, follower in enumerate(active_followers):
                 try:
-                    # Calcular amount copiado
-                    copy_amount = self._calculate_copy_amount(follower, trade_data)
+                    copy_amount = float(copy_amounts[i])
 
                     if copy_amount <= 0:
                         continue
 
                     # Criar copy trade
                     copy_trade = CopyTrade(
-                        id=str(uuid.uuid4()),
+                        id=self._new_id(),
                         leader_id=leader_id,
                         follower_id=follower.id,
                         original_trade_id=trade_data.get('id', ''),
@@ -586,8 +1004,9 @@ class CopyTradingSystem:
                         executed_price=0.0,
                         copy_percentage=copy_amount / trade_data.get('amount', 1.0),
                         status='pending',
-                        created_at=datetime.now().isoformat(),
-                        executed_at=''
+                        created_at=now_iso,
+                        executed_at='',
+                        created_ts=now_ts
                     )
 
                     # Executar trade simulado
@@ -595,25 +1014,34 @@ class CopyTradingSystem:
 
                     if success:
                         copy_trade.status = 'executed'
-                        copy_trade.executed_at = datetime.now().isoformat()
-                        copy_trade.executed_price = trade_data.get('price', 0.0) * np.random.uniform(0.999, 1.001)
+                        copy_trade.executed_at = now_iso
+                        copy_trade.executed_price = float(executed_prices[i])
 
                         # Atualizar performance do follower
-                        self._update_follower_performance(follower, copy_trade, trade_data)
+                        self._update_follower_performance(follower, copy_trade, float(pnls[i]), now)
+                        updated_followers.append(follower)
                     else:
                         copy_trade.status = 'failed'
                         copy_trade.error_message = "Falha na execução simulada"
 
-                    # Salvar trade
                     self.copy_trades[copy_trade.id] = copy_trade
-                    self._save_copy_trade(copy_trade)
-
                     copied_trades.append(copy_trade)
 
                 except Exception as e:
                     logger.error(f"Erro ao copiar trade para follower {follower.id}: {e}")
                     continue
 
+            # Salvar trades e followers do ciclo em lote (uma transação cada)
+            if copied_trades:
+                self._save_copy_trades_bulk(copied_trades)
+            if updated_followers:
+                self._update_follower_performance_rows(updated_followers)
+                # Histórico de performance dos followers atualizados
+                self._save_performance_snapshots_bulk([
+                    self._snapshot_row(follower.id, 'follower', follower.performance, now)
+                    for follower in updated_followers
+                ])
+
             logger.info(f"Trade sincronizado: {len(copied_trades)} cópias executadas")
             return copied_trades
 
@@ -621,34 +1049,37 @@ class CopyTradingSystem:
             logger.error(f"Erro na sincronização: {e}")
             return []
 
-    def _calculate_copy_amount(self, follower: Follower, trade_data: Dict[str, Any]) -> float:
-        """Calcular amount a ser copiado"""
+    def _calculate_copy_batch(self, followers: List[Follower],
+                              trade_data: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Calcular amounts copiados e PnL simulado para vários followers"""
+        n = len(followers)
         try:
-            # Amount base da alocação do follower
-            base_amount = follower.allocation_amount
-
-            # Verificar limites de risco
-            trade_value = trade_data.get('amount', 0) * trade_data.get('price', 0)
-            max_position_size = follower.allocation_amount * self.config['risk_management']['position_size_limit']
-
-            if trade_value > max_position_size:
-                # Reduzir amount proporcionalmente
-                ratio = max_position_size / trade_value
-                base_amount *= ratio
-
-            # Aplicar percentual de alocação
-            copy_amount = base_amount * follower.allocation_percentage
-
-            # Aplicar multiplicadores de risco
-            risk_multipliers = {'low': 0.7, 'medium': 1.0, 'high': 1.3}
-            risk_multiplier = risk_multipliers.get(follower.risk_level, 1.0)
-            copy_amount *= risk_multiplier
-
-            return min(copy_amount, follower.allocation_amount * 0.5)  # Máximo 50% da alocação por trade
+            risk_multipliers = self.cfg.risk_mult_copy
+
+            # Colunas (SoA) dos campos numéricos usados no kernel
+            allocation = np.fromiter((f.allocation_amount for f in followers),
+                                     dtype=np.float64, count=n)
+            allocation_pct = np.fromiter((f.allocation_percentage for f in followers),
+                                         dtype=np.float64, count=n)
+            risk_mult = np.fromiter((risk_multipliers.get(f.risk_level, 1.0) for f in followers),
+                                    dtype=np.float64, count=n)
+
+            # Variações simuladas (na implementação real seria o preço atual)
+            with self._rng_lock:
+                price_mult = self._rng.uniform(0.98, 1.02, n)
+                pnl_mult = self._rng.uniform(0.8, 1.2, n)
+
+            return _copy_and_pnl_kernel(
+                allocation, allocation_pct, risk_mult,
+                self.cfg.pos_limit,
+                float(trade_data.get('amount', 0)), float(trade_data.get('price', 0)),
+                1.0 if trade_data.get('side') == 'buy' else -1.0,
+                price_mult, pnl_mult
+            )
 
         except Exception as e:
             logger.error(f"Erro ao calcular copy amount: {e}")
-            return 0.0
+            return np.zeros(n), np.zeros(n)
 
     def _execute_copy_trade(self, copy_trade: CopyTrade, follower: Follower) -> bool:
         """Executar trade copiado (simulado)"""
@@ -674,19 +1105,12 @@ class CopyTradingSystem:
             logger.error(f"Erro na execução do copy trade: {e}")
             return False
 
-    def _update_follower_performance(self, follower: Follower, copy_trade: CopyTrade, original_trade: Dict[str, Any]):
-        """Atualizar performance do follower"""
+    def _update_follower_performance(self, follower: Follower, copy_trade: CopyTrade, pnl: float,
+                                     now: Optional[datetime] = None):
+        """Atualizar performance do follower com o PnL do trade copiado"""
         try:
-            # Simular PnL (na implementação real seria calculado baseado em preço atual)
             if copy_trade.status == 'executed':
-                # Profit simulado baseado no side
-                if copy_trade.side == 'buy':
-                    current_price = copy_trade.price * np.random.uniform(0.98, 1.02)
-                else:
-                    current_price = copy_trade.price * np.random.uniform(0.98, 1.02)
-
-                pnl = (current_price - copy_trade.price) * copy_trade.amount if copy_trade.side == 'buy' else (copy_trade.price - current_price) * copy_trade.amount
-                pnl *= np.random.uniform(0.8, 1.2)  # Adicionar variação
+                now = now or datetime.now()
 
                 # Atualizar performance
                 follower.performance['total_pnl'] = follower.performance.get('total_pnl', 0) + pnl
@@ -705,64 +1129,58 @@ class CopyTradingSystem:
                 else:
                     follower.performance['wins'] = follower.performance.get('wins', 0)
 
-                follower.last_sync = datetime.now().isoformat()
-
-                # Salvar
-                self._save_follower(follower)
-
-                # Salvar performance no histórico
-                self._save_performance_snapshot(follower.id, 'follower', follower.performance)
+                follower.last_sync = now.isoformat()
 
         except Exception as e:
             logger.error(f"Erro ao atualizar performance do follower: {e}")
 
     def _save_copy_trade(self, copy_trade: CopyTrade):
         """Salvar copy trade no banco"""
+        self._save_copy_trades_bulk([copy_trade])
+
+    def _save_copy_trades_bulk(self, copy_trades: List[CopyTrade]):
+        """Salvar vários copy trades numa única transação"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT OR REPLACE INTO copy_trades
-                (id, leader_id, follower_id, original_trade_id, symbol, side,
-                 amount, price, executed_price, copy_percentage, status,
-                 created_at, executed_at, error_message)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            rows = [(
                 copy_trade.id, copy_trade.leader_id, copy_trade.follower_id,
                 copy_trade.original_trade_id, copy_trade.symbol, copy_trade.side,
                 copy_trade.amount, copy_trade.price, copy_trade.executed_price,
                 copy_trade.copy_percentage, copy_trade.status, copy_trade.created_at,
-                copy_trade.executed_at, copy_trade.error_message
-            ))
+                copy_trade.executed_at, copy_trade.error_message,
+                copy_trade.created_ts or int(datetime.fromisoformat(copy_trade.created_at).timestamp())
+            ) for copy_trade in copy_trades]
 
-            conn.commit()
-            conn.close()
+            with self._transaction() as conn:
+                conn.executemany(SAVE_COPY_TRADE_SQL, rows)
 
         except Exception as e:
             logger.error(f"Erro ao salvar copy trade: {e}")
 
-    def _save_performance_snapshot(self, trader_id: str, trader_type: str, performance: Dict[str, Any]):
+    def _save_performance_snapshot(self, trader_id: str, trader_type: str, performance: Dict[str, Any],
+                                   now: Optional[datetime] = None):
         """Salvar snapshot de performance"""
+        self._save_performance_snapshots_bulk([
+            self._snapshot_row(trader_id, trader_type, performance, now or datetime.now())
+        ])
+
+    def _snapshot_row(self, trader_id: str, trader_type: str, performance: Dict[str, Any],
+                      now: datetime) -> tuple:
+        """Linha de copy_performance para um snapshot"""
+        return (
+            trader_id, trader_type, now.date().isoformat(),
+            performance.get('total_value', 10000.0), performance.get('total_pnl', 0.0),
+            performance.get('total_return', 0.0), performance.get('positions_count', 0),
+            performance.get('trades_count', 0), performance.get('allocation_amount', 0.0),
+            _json_dumps(performance), now.isoformat()
+        )
+
+    def _save_performance_snapshots_bulk(self, rows: List[tuple]):
+        """Salvar vários snapshots de performance numa única transação"""
+        if not rows:
+            return
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT INTO copy_performance
-                (trader_id, trader_type, date, total_value, pnl, return_percentage,
-                 positions_count, trades_count, aum, metrics, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                trader_id, trader_type, datetime.now().date().isoformat(),
-                performance.get('total_value', 10000.0), performance.get('total_pnl', 0.0),
-                performance.get('total_return', 0.0), performance.get('positions_count', 0),
-                performance.get('trades_count', 0), performance.get('allocation_amount', 0.0),
-                json.dumps(performance), datetime.now().isoformat()
-            ))
-
-            conn.commit()
-            conn.close()
+            with self._transaction() as conn:
+                conn.executemany(SAVE_PERFORMANCE_SQL, rows)
 
         except Exception as e:
             logger.error(f"Erro ao salvar performance snapshot: {e}")
@@ -771,145 +1189,263 @@ class CopyTradingSystem:
         """Inicializar sistema de sincronização"""
         if self.config['sync']['enabled']:
             self.sync_active = True
-            self.sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
+            self.sync_thread = threading.Thread(target=self._run_sync_loop, daemon=True)
             self.sync_thread.start()
             print("🔄 Sistema de sincronização iniciado")
 
-    def _sync_loop(self):
+    def _run_sync_loop(self):
+        """Executar o loop de sincronização num event loop próprio"""
+        asyncio.run(self._run_background_tasks())
+
+    async def _run_background_tasks(self):
+        """Loop de sincronização e flusher de escritas em paralelo"""
+        await asyncio.gather(self._sync_loop(), self._flush_loop())
+
+    async def _flush_loop(self):
+        """Gravar periodicamente leaders/followers alterados"""
+        while self.sync_active:
+            await asyncio.sleep(WRITE_BEHIND_FLUSH_SECONDS)
+            await asyncio.to_thread(self._flush_dirty)
+
+        # Última gravação ao parar
+        await asyncio.to_thread(self._flush_dirty)
+
+    async def _sync_loop(self):
         """Loop de sincronização"""
+        iteration = 0
         while self.sync_active:
             try:
                 # Sincronizar performance dos leaders
-                self._sync_leader_performance()
+                await self._sync_leader_performance()
 
                 # Verificar stop losses e limites
-                self._check_risk_limits()
+                await asyncio.to_thread(self._check_risk_limits)
 
                 # Limpar trades antigos
-                self._cleanup_old_trades()
+                await asyncio.to_thread(self._cleanup_old_trades)
+
+                # Checkpoint do WAL a cada N ciclos
+                iteration += 1
+                if iteration % WAL_CHECKPOINT_EVERY == 0:
+                    await asyncio.to_thread(self._checkpoint_wal)
 
-                time.sleep(self.config['sync']['interval_seconds'])
+                await asyncio.sleep(self.cfg.interval)
 
             except Exception as e:
                 logger.error(f"Erro no loop de sincronização: {e}")
-                time.sleep(5)
+                await asyncio.sleep(5)
 
-    def _sync_leader_performance(self):
-        """Sincronizar performance dos leaders"""
-        for leader in self.leaders.values():
-            try:
-                # Calcular métricas de performance
-                metrics = self._calculate_leader_performance(leader)
+    def _checkpoint_wal(self):
+        """Checkpoint passivo do WAL (não bloqueia leitores/escritores)"""
+        try:
+            with self._db_lock:
+                self._conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+        except Exception as e:
+            logger.error(f"Erro no checkpoint do WAL: {e}")
 
-                # Atualizar leader
-                leader.performance_score = metrics.get('overall_score', 0.0)
-                leader.stats.update(metrics)
-                leader.last_active = datetime.now().isoformat()
+    async def _sync_leader_performance(self):
+        """Sincronizar performance dos leaders (concorrência limitada)"""
+        now = datetime.now()
+        semaphore = asyncio.Semaphore(self.cfg.max_concurrent)
 
-                # Salvar
-                self._save_leader(leader)
+        async def sync_one(leader: LeaderTrader):
+            async with semaphore:
+                return await asyncio.to_thread(self._sync_leader, leader, now)
 
-                # Salvar snapshot
-                self._save_performance_snapshot(leader.id, 'leader', metrics)
+        rows = await asyncio.gather(*(sync_one(leader) for leader in list(self.leaders.values())))
 
-            except Exception as e:
-                logger.error(f"Erro ao sincronizar leader {leader.id}: {e}")
+        # Snapshots de todos os leaders do ciclo num único executemany
+        self._save_performance_snapshots_bulk([row for row in rows if row])
 
-    def _calculate_leader_performance(self, leader: LeaderTrader) -> Dict[str, Any]:
+    def _sync_leader(self, leader: LeaderTrader, now: datetime) -> Optional[tuple]:
+        """Sincronizar performance de um leader (devolve a linha de snapshot)"""
+        try:
+            # Calcular métricas de performance (sempre recalculadas aqui)
+            metrics = self._calculate_leader_performance(leader, refresh=True)
+
+            # Atualizar leader
+            leader.performance_score = metrics.get('overall_score', 0.0)
+            leader.stats.update(metrics)
+            leader.last_active = now.isoformat()
+
+            # Salvar (só as colunas alteradas)
+            self._update_leader_performance(leader)
+
+            # Snapshot gravado em lote pelo chamador
+            return self._snapshot_row(leader.id, 'leader', metrics, now)
+
+        except Exception as e:
+            logger.error(f"Erro ao sincronizar leader {leader.id}: {e}")
+            return None
+
+    def _calculate_leader_performance(self, leader: LeaderTrader,
+                                      refresh: bool = False) -> Dict[str, Any]:
+        """Obter performance do leader (cache com TTL, invalidado por novos trades)"""
+        now = time.time()
+
+        cached = leader.cached_performance
+        if cached and now - cached[0] < PERFORMANCE_CACHE_TTL and not refresh:
+            return dict(cached[1])
+
+        metrics = self._compute_leader_performance(leader)
+        if metrics:
+            leader.cached_performance = (now, metrics)
+        return dict(metrics)
+
+    def _compute_leader_performance(self, leader: LeaderTrader) -> Dict[str, Any]:
         """Calcular performance do leader"""
         try:
             # Obter trades do leader (simulado)
             leader_trades = self._get_leader_trades(leader.id)
 
             if not leader_trades:
-                return {
-                    'total_trades': 0,
-                    'win_rate': 0.0,
-                    'total_return': 0.0,
-                    'sharpe_ratio': 0.0,
-                    'max_drawdown': 0.0,
-                    'profit_factor': 1.0,
-                    'consistency': 0.0,
-                    'overall_score': 0.0
-                }
+                return self._metrics_from_reductions(0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
 
-            # Calcular métricas
+            # Colunas numéricas dos trades
             total_trades = len(leader_trades)
-            winning_trades = len([t for t in leader_trades if t.get('pnl', 0) > 0])
-            win_rate = winning_trades / total_trades if total_trades > 0 else 0
-
-            total_pnl = sum(t.get('pnl', 0) for t in leader_trades)
-            total_return = total_pnl / 10000  # Assumir capital inicial
-
-            # Calcular Sharpe ratio (simplificado)
-            returns = [t.get('return', 0) for t in leader_trades]
-            if returns and len(returns) > 1:
-                mean_return = np.mean(returns)
-                std_return = np.std(returns)
-                sharpe_ratio = mean_return / std_return if std_return > 0 else 0
-            else:
-                sharpe_ratio = 0
-
-            # Max drawdown (simplificado)
-            cumulative_pnl = np.cumsum([t.get('pnl', 0) for t in leader_trades])
-            running_max = np.maximum.accumulate(cumulative_pnl)
-            drawdown = (cumulative_pnl - running_max) / (running_max + 1)
-            max_drawdown = abs(np.min(drawdown))
-
-            # Profit factor
-            gross_profit = sum(t.get('pnl', 0) for t in leader_trades if t.get('pnl', 0) > 0)
-            gross_loss = abs(sum(t.get('pnl', 0) for t in leader_trades if t.get('pnl', 0) < 0))
-            profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
-
-            # Consistência (baseada na variância dos retornos)
-            consistency = 1.0 / (1.0 + np.std(returns)) if returns else 0
-
-            # Score geral
-            score_components = [
-                win_rate * 25,
-                min(total_return * 10, 25),
-                min(sharpe_ratio * 10, 25),
-                max(0, (0.20 - max_drawdown) * 50),  # Penalizar drawdown alto
-                min(profit_factor * 10, 20),
-                consistency * 10
-            ]
-            overall_score = sum(score_components)
+            pnl = np.fromiter((t.pnl for t in leader_trades),
+                              dtype=np.float64, count=total_trades)
+            returns = np.fromiter((t.return_ for t in leader_trades),
+                                  dtype=np.float64, count=total_trades)
 
-            return {
-                'total_trades': total_trades,
-                'win_rate': win_rate,
-                'total_return': total_return,
-                'sharpe_ratio': sharpe_ratio,
-                'max_drawdown': max_drawdown,
-                'profit_factor': profit_factor,
-                'consistency': consistency,
-                'overall_score': min(overall_score, 100)  # Limitar a 100
-            }
+            # Reduções numa única passagem (kernel Numba ou NumPy)
+            return self._metrics_from_reductions(
+                total_trades, *_leader_metrics(pnl, returns, LEADER_INITIAL_CAPITAL))
 
         except Exception as e:
             logger.error(f"Erro ao calcular performance do leader: {e}")
             return {}
 
-    def _get_leader_trades(self, leader_id: str) -> List[Dict[str, Any]]:
+    def _compute_leaders_performance_batch(self, leaders: List[LeaderTrader]) -> Dict[str, Dict[str, Any]]:
+        """Calcular performance de vários leaders com reduções NumPy segmentadas"""
+        results = {}
+        try:
+            trades_by_leader = []
+            for leader in leaders:
+                leader_trades = self._get_leader_trades(leader.id)
+                if leader_trades:
+                    trades_by_leader.append((leader, leader_trades))
+                else:
+                    results[leader.id] = self._metrics_from_reductions(0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+            if not trades_by_leader:
+                return results
+
+            # Todos os trades num buffer contíguo + comprimento de cada segmento
+            lengths = np.fromiter((len(t) for _, t in trades_by_leader), dtype=np.int64,
+                                  count=len(trades_by_leader))
+            total = int(lengths.sum())
+            all_trades = itertools.chain.from_iterable(t for _, t in trades_by_leader)
+            pnls = np.fromiter((t.pnl for t in all_trades), dtype=np.float64, count=total)
+            all_trades = itertools.chain.from_iterable(t for _, t in trades_by_leader)
+            returns = np.fromiter((t.return_ for t in all_trades), dtype=np.float64, count=total)
+
+            columns = _leader_metrics_batch(pnls, returns, lengths, LEADER_INITIAL_CAPITAL)
+
+            for i, (leader, _) in enumerate(trades_by_leader):
+                results[leader.id] = self._metrics_from_reductions(
+                    int(lengths[i]), *(float(column[i]) for column in columns))
+
+        except Exception as e:
+            logger.error(f"Erro ao calcular performance dos leaders: {e}")
+
+        return results
+
+    def _refresh_leader_performance_batch(self, leaders: List[LeaderTrader]):
+        """Recalcular em lote a performance em cache expirada"""
+        now = time.time()
+        stale = []
+        for leader in leaders:
+            cached = leader.cached_performance
+            if not cached or now - cached[0] >= PERFORMANCE_CACHE_TTL:
+                stale.append(leader)
+
+        if stale:
+            batch = self._compute_leaders_performance_batch(stale)
+            for leader in stale:
+                metrics = batch.get(leader.id)
+                if metrics:
+                    leader.cached_performance = (now, metrics)
+
+    def _metrics_from_reductions(self, total_trades: int, wins: int, gross_profit: float,
+                                 gross_loss: float, total_pnl: float, max_drawdown: float,
+                                 mean_return: float, std_return: float) -> Dict[str, Any]:
+        """Montar as métricas do leader a partir das reduções sobre os trades"""
+        if total_trades == 0:
+            return {
+                'total_trades': 0,
+                'win_rate': 0.0,
+                'total_return': 0.0,
+                'sharpe_ratio': 0.0,
+                'max_drawdown': 0.0,
+                'profit_factor': 1.0,
+                'consistency': 0.0,
+                'overall_score': 0.0
+            }
+
+        win_rate = wins / total_trades
+        total_return = total_pnl / LEADER_INITIAL_CAPITAL
+
+        # Calcular Sharpe ratio (simplificado)
+        if total_trades > 1:
+            sharpe_ratio = mean_return / std_return if std_return > 0 else 0
+        else:
+            sharpe_ratio = 0
+
+        # Profit factor
+        # Sem perdas: valor finito limitado em vez de inf (serializável e seguro no score)
+        profit_factor = gross_profit / gross_loss if gross_loss > 1e-9 else min(gross_profit, 1e6)
+
+        # Consistência (baseada na variância dos retornos)
+        consistency = 1.0 / (1.0 + std_return)
+
+        # Score geral (expressão escalar única, limitada a 100)
+        overall_score = min(100.0,
+                            win_rate * 25
+                            + min(total_return * 10, 25)
+                            + min(sharpe_ratio * 10, 25)
+                            + max(0.0, (0.20 - max_drawdown) * 50)  # Penalizar drawdown alto
+                            + min(profit_factor * 10, 20)
+                            + consistency * 10)
+
+        return {
+            'total_trades': total_trades,
+            'win_rate': win_rate,
+            'total_return': total_return,
+            'sharpe_ratio': sharpe_ratio,
+            'max_drawdown': max_drawdown,
+            'profit_factor': profit_factor,
+            'consistency': consistency,
+            'overall_score': overall_score
+        }
+
+    def _get_leader_trades(self, leader_id: str) -> List[SimTrade]:
         """Obter trades do leader (simulado)"""
         # Na implementação real, seria obtido do sistema de trading
         # Por enquanto, gerar trades simulados para teste
 
-        trades = []
-        for i in range(np.random.randint(10, 100)):
-            trade = {
-                'id': f"trade_{i}",
-                'pnl': np.random.normal(0, 100),
-                'return': np.random.normal(0, 0.01),
-                'timestamp': datetime.now() - timedelta(days=np.random.randint(1, 365))
-            }
-            trades.append(trade)
-
-        return trades
+        with self._rng_lock:
+            n = int(self._rng.integers(10, 100))
+            pnls = self._rng.normal(0, 100, n)
+            returns = self._rng.normal(0, 0.01, n)
+            days = self._rng.integers(1, 365, n)
+
+        now = datetime.now()
+        return [
+            SimTrade(
+                id=f"trade_{i}",
+                pnl=float(pnl),
+                return_=float(ret),
+                timestamp=now - timedelta(days=int(d))
+            )
+            for i, (pnl, ret, d) in enumerate(zip(pnls, returns, days))
+        ]
 
     def _check_risk_limits(self):
         """Verificar limites de risco dos followers"""
-        for follower in self.followers.values():
+        paused = []
+
+        for follower in list(self.followers.values()):
             if follower.status != CopyTradingStatus.ACTIVE:
                 continue
 
@@ -919,7 +1455,8 @@ class CopyTradingSystem:
                 if current_return < -follower.max_drawdown_limit:
                     # Pausar follower
                     follower.status = CopyTradingStatus.PAUSED
-                    self._save_follower(follower)
+                    self._index_follower(follower)
+                    paused.append(follower)
                     logger.warning(f"Follower {follower.id} pausado por drawdown excessivo")
 
                 # Verificar stop loss
@@ -930,22 +1467,22 @@ class CopyTradingSystem:
             except Exception as e:
                 logger.error(f"Erro ao verificar risco do follower {follower.id}: {e}")
 
+        # Status alterados gravados numa única transação
+        if paused:
+            self._update_follower_statuses(paused)
+
     def _cleanup_old_trades(self):
         """Limpar trades antigos"""
         try:
             cutoff_date = datetime.now() - timedelta(days=90)
 
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._db_lock:
+                cursor = self._conn.execute('''
+                    DELETE FROM copy_trades
+                    WHERE created_ts < ?
+                ''', (int(cutoff_date.timestamp()),))
 
-            cursor.execute('''
-                DELETE FROM copy_trades
-                WHERE datetime(created_at) < datetime(?)
-            ''', (cutoff_date.isoformat(),))
-
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+                deleted_count = cursor.rowcount
 
             if deleted_count > 0:
                 logger.info(f"Trades antigos removidos: {deleted_count}")
@@ -957,41 +1494,77 @@ class CopyTradingSystem:
                        limit: int = 50) -> List[Dict[str, Any]]:
         """Obter leaderboard de traders"""
         try:
-            # Calcular scores para todos os leaders
-            leaderboard = []
-
-            for leader in self.leaders.values():
-                if not self._leader_meets_criteria(leader):
-                    continue
-
-                # Obter performance
-                performance = self._calculate_leader_performance(leader)
-
-                # Calcular score baseado na métrica solicitada
-                score = self._calculate_metric_score(performance, metric)
-
-                leaderboard.append({
-                    'id': leader.id,
-                    'username': leader.username,
-                    'display_name': leader.display_name,
-                    'avatar_url': leader.avatar_url,
-                    'level': leader.level.value,
-                    'total_followers': leader.total_followers,
-                    'total_aum': leader.total_aum,
-                    'verified': leader.verified,
-                    'performance': performance,
-                    'score': score
-                })
-
-            # Ordenar por score
-            leaderboard.sort(key=lambda x: x['score'], reverse=True)
-
-            return leaderboard[:limit]
+            return self._top_k_leaders(limit, metric)
 
         except Exception as e:
             logger.error(f"Erro ao obter leaderboard: {e}")
             return []
 
+    def _leaderboard_for(self, metric: PerformanceMetric) -> Tuple[float, np.ndarray, List[Dict[str, Any]]]:
+        """Leaderboard memorizado da métrica (reconstruído se expirado)"""
+        cached = self._lb_cache.get(metric)
+        if not cached or time.time() - cached[0] >= PERFORMANCE_CACHE_TTL:
+            cached = self._build_leaderboard(metric)
+            self._lb_cache[metric] = cached
+        return cached
+
+    def _iter_scored_leaders(self, metric: PerformanceMetric):
+        """Iterar (score, linha) do leaderboard memorizado"""
+        _, _, rows = self._leaderboard_for(metric)
+        for row in rows:
+            yield row['score'], row
+
+    def _top_k_leaders(self, k: int, metric: PerformanceMetric) -> List[Dict[str, Any]]:
+        """Top-K leaders por score (argpartition em vez de ordenar todos)"""
+        _, scores, rows = self._leaderboard_for(metric)
+        if k <= 0 or not rows:
+            return []
+
+        if k < len(rows):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        # Materializar só as k linhas devolvidas
+        return [dict(rows[i]) for i in top]
+
+    def _build_leaderboard(self, metric: PerformanceMetric) -> Tuple[float, np.ndarray, List[Dict[str, Any]]]:
+        """Calcular linhas e scores do leaderboard para uma métrica"""
+        rows = []
+        leaders = [leader for leader in list(self.leaders.values())
+                   if self._leader_meets_criteria(leader)]
+
+        # Performance expirada de todos os leaders calculada num só lote
+        self._refresh_leader_performance_batch(leaders)
+
+        for leader in leaders:
+            # Obter performance
+            performance = self._calculate_leader_performance(leader)
+
+            # Calcular score baseado na métrica solicitada
+            score = self._calculate_metric_score(performance, metric)
+
+            rows.append({
+                'id': leader.id,
+                'username': leader.username,
+                'display_name': leader.display_name,
+                'avatar_url': leader.avatar_url,
+                'level': leader.level.value,
+                'total_followers': leader.total_followers,
+                'total_aum': leader.total_aum,
+                'verified': leader.verified,
+                'performance': performance,
+                'score': score
+            })
+
+        scores = np.fromiter((row['score'] for row in rows), dtype=np.float64, count=len(rows))
+        return time.time(), scores, rows
+
+    def _invalidate_leaderboard(self):
+        """Descartar leaderboards memorizados (leaders alterados)"""
+        self._lb_cache.clear()
+
     def _leader_meets_criteria(self, leader: LeaderTrader) -> bool:
         """Verificar se leader atende aos critérios mínimos"""
         filters = self.config['filters']
@@ -1010,7 +1583,7 @@ class CopyTradingSystem:
 
         # Verificar dias mínimos de trading
         if leader.verified:
-            trading_days = (datetime.now() - datetime.fromisoformat(leader.created_at)).days
+            trading_days = (time.time() - leader.created_ts) / 86400.0
             if trading_days < filters['min_trading_days']:
                 return False
 
@@ -1018,17 +1591,7 @@ class CopyTradingSystem:
 
     def _calculate_metric_score(self, performance: Dict[str, Any], metric: PerformanceMetric) -> float:
         """Calcular score baseado na métrica"""
-        metric_weights = {
-            PerformanceMetric.TOTAL_RETURN: 1.0,
-            PerformanceMetric.SHARPE_RATIO: 0.8,
-            PerformanceMetric.WIN_RATE: 0.6,
-            PerformanceMetric.MAX_DRAWDOWN: 0.9,  # Menor é melhor
-            PerformanceMetric.PROFIT_FACTOR: 0.7,
-            PerformanceMetric.CONSISTENCY: 0.5,
-            PerformanceMetric.TRADES_COUNT: 0.3
-        }
-
-        weight = metric_weights.get(metric, 1.0)
+        weight = self._METRIC_WEIGHTS.get(metric, 1.0)
 
         if metric == PerformanceMetric.MAX_DRAWDOWN:
             # Para drawdown, menor é melhor
@@ -1036,36 +1599,34 @@ class CopyTradingSystem:
         else:
             return weight * performance.get(metric.value, 0.0)
 
-    def get_follower_performance(self, follower_id: str) -> Dict[str, Any]:
-        """Obter performance de um follower"""
+    def get_follower_performance(self, follower_id: str) -> Mapping[str, Any]:
+        """Obter performance de um follower (vista sem cópia; usar dict() para serializar)"""
         try:
-            follower = self.followers.get(follower_id)
+            follower = self._get_follower(follower_id)
             if not follower:
                 return {}
 
-            # Calcular performance detalhada
-            performance = follower.performance.copy()
+            performance = follower.performance
 
-            # Adicionar métricas calculadas
-            if follower.performance.get('trades_count', 0) > 0:
-                performance['avg_trade'] = (follower.performance.get('total_pnl', 0) /
-                                          follower.performance['trades_count'])
-            else:
-                performance['avg_trade'] = 0.0
+            # Métricas calculadas sobrepostas à performance guardada
+            trades_count = performance.get('trades_count', 0)
+            computed = {
+                'avg_trade': performance.get('total_pnl', 0) / trades_count if trades_count > 0 else 0.0
+            }
 
             # Calcular período ativo
-            started_at = datetime.fromisoformat(follower.performance.get('started_at', follower.created_at))
+            started_at = datetime.fromisoformat(performance.get('started_at', follower.created_at))
             days_active = (datetime.now() - started_at).days
-            performance['days_active'] = days_active
+            computed['days_active'] = days_active
 
             if days_active > 0:
-                performance['daily_return'] = (performance.get('total_return', 0) / days_active)
-                performance['trades_per_day'] = (performance.get('trades_count', 0) / days_active)
+                computed['daily_return'] = performance.get('total_return', 0) / days_active
+                computed['trades_per_day'] = trades_count / days_active
             else:
-                performance['daily_return'] = 0.0
-                performance['trades_per_day'] = 0.0
+                computed['daily_return'] = 0.0
+                computed['trades_per_day'] = 0.0
 
-            return performance
+            return ChainMap(computed, performance)
 
         except Exception as e:
             logger.error(f"Erro ao obter performance do follower {follower_id}: {e}")
@@ -1074,20 +1635,22 @@ class CopyTradingSystem:
     def stop_copying_leader(self, follower_id: str) -> bool:
         """Parar de copiar um leader"""
         try:
-            follower = self.followers.get(follower_id)
+            follower = self._get_follower(follower_id)
             if not follower:
                 return False
 
             # Alterar status
             follower.status = CopyTradingStatus.INACTIVE
-            self._save_follower(follower)
+            self._index_follower(follower)
 
             # Atualizar stats do leader
             leader = self.leaders.get(follower.leader_id)
             if leader:
                 leader.total_followers = max(0, leader.total_followers - 1)
                 leader.total_aum = max(0, leader.total_aum - follower.allocation_amount)
-                self._save_leader(leader)
+
+            # Follower e leader gravados em lote pelo flusher
+            self._mark_dirty(leader=leader, follower=follower)
 
             logger.info(f"Copy trading parado para follower {follower_id}")
             return True
@@ -1101,22 +1664,26 @@ class CopyTradingSystem:
         try:
             # Contadores
             total_leaders = len(self.leaders)
-            total_followers = len(self.followers)
+            with self._db_lock:
+                total_followers = self._conn.execute(
+                    'SELECT COUNT(*) FROM copy_followers').fetchone()[0]
             active_copy_trades = len([t for t in self.copy_trades.values() if t.status == 'pending'])
 
-            # AUM total
-            total_aum = sum(leader.total_aum for leader in self.leaders.values())
+            # AUM total e médias numa única passagem pelos leaders
+            total_aum = 0.0
+            total_score = 0.0
+            total_leader_followers = 0
+            for leader in self.leaders.values():
+                total_aum += leader.total_aum
+                total_score += leader.performance_score
+                total_leader_followers += leader.total_followers
 
-            # Performance média
-            if self.leaders:
-                avg_performance = np.mean([leader.performance_score for leader in self.leaders.values()])
-                avg_followers = np.mean([leader.total_followers for leader in self.leaders.values()])
-            else:
-                avg_performance = 0
-                avg_followers = 0
+            avg_performance = total_score / total_leaders if total_leaders else 0
+            avg_followers = total_leader_followers / total_leaders if total_leaders else 0
 
             # Top performers
-            top_leaders = self.get_leaderboard(PerformanceMetric.TOTAL_RETURN, 5)
+            top_leaders = [dict(row) for _, row in heapq.nlargest(
+                5, self._iter_scored_leaders(PerformanceMetric.TOTAL_RETURN), key=lambda x: x[0])]
 
             return {
                 'total_leaders': total_leaders,
@@ -18,24 +18,191 @@ Data: 2025-11-06
 Versão: 1.0.0
 """
 
+import concurrent.futures
+import heapq
+import itertools
 import json
 import logging
+import logging.handlers
+import operator
 import os
 import subprocess
+import sys
 import threading
 import time
+from collections import deque
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import Dict, List, Optional
 
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _enable_ansi() -> bool:
+    """Verificar se o terminal aceita sequências ANSI"""
+    if sys.stdout is None or not sys.stdout.isatty():
+        return False
+    if os.name != 'nt' or os.environ.get('ANSICON') or 'WT_SESSION' in os.environ:
+        return True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING (Windows 10+)
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
+
+
+SUPPORTS_ANSI = _enable_ansi()
+BACKUP_KEEP = 48  # Backups horários mantidos (2 dias)
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+
+def _clear_screen():
+    """Limpar o terminal sem criar um processo quando possível"""
+    if SUPPORTS_ANSI:
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
+    else:
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+
+def _write_json(filename: str, data: Dict):
+    """Gravar JSON indentado (orjson quando disponível) numa única escrita atômica"""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        payload = json.dumps(data, indent=2).encode()
+
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, filename)
+
+
+def _risk_numpy(profit):
+    """Métricas de risco com reduções NumPy"""
+    max_loss = float(profit.min()) if profit.size else 0.0
+    return (float(np.abs(profit).sum()), max_loss,
+            min(100.0, abs(max_loss) * 10), abs(max_loss) * 1.65)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _risk_kernel(profit):
+        """Métricas de risco numa única passagem (Numba)"""
+        total_exposure = 0.0
+        max_loss = 0.0
+        for i in range(profit.shape[0]):
+            p = profit[i]
+            total_exposure += abs(p)
+            if i == 0 or p < max_loss:
+                max_loss = p
+        return (total_exposure, max_loss,
+                min(100.0, abs(max_loss) * 10), abs(max_loss) * 1.65)
+else:
+    # Sem Numba o laço escalar seria mais lento que as reduções NumPy
+    _risk_kernel = _risk_numpy
+
+
+STOP_LOSS_PCT = -2.0
+TAKE_PROFIT_PCT = 5.0
+EXIT_NONE, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT = 0, 1, 2
+
+
+def _scan_exits_numpy(profit, active):
+    """Classificar saídas (0 nenhuma, 1 stop loss, 2 take profit) com máscaras NumPy"""
+    codes = np.where(profit < STOP_LOSS_PCT, EXIT_STOP_LOSS,
+                     np.where(profit > TAKE_PROFIT_PCT, EXIT_TAKE_PROFIT, EXIT_NONE))
+    return np.where(active, codes, EXIT_NONE).astype(np.int8)
+
+
+if NUMBA_AVAILABLE:
+    # Sem parallel=True: a camada de threads do Numba, acionada a partir da
+    # thread de monitoramento, bloqueia o encerramento do interpretador
+    @njit(cache=True)
+    def _scan_exits(profit, active):
+        """Classificar saídas numa única passagem sobre as colunas (Numba)"""
+        codes = np.zeros(profit.shape[0], dtype=np.int8)
+        for i in range(profit.shape[0]):
+            if active[i]:
+                if profit[i] < STOP_LOSS_PCT:
+                    codes[i] = EXIT_STOP_LOSS
+                elif profit[i] > TAKE_PROFIT_PCT:
+                    codes[i] = EXIT_TAKE_PROFIT
+        return codes
+else:
+    _scan_exits = _scan_exits_numpy
+
+
+_ALERT_ICONS = MappingProxyType({
+    'ENTRY_SIGNAL': '🟢',
+    'EXIT_SIGNAL': '🔴',
+    'STOP_LOSS': '🛑',
+    'TAKE_PROFIT': '💰',
+    'HIGH_RISK': '🚨',
+    'INFO': 'ℹ️'
+})
+
+_STATUS_ICONS = MappingProxyType({
+    'ATIVO': '🟢',
+    'STOP_LOSS': '🔴',
+    'TAKE_PROFIT': '🟢',
+    'CLOSED': '⚫'
+})
+_PROFIT_ICONS = ('🟢', '🔴')  # Indexado por profit < 0
+
+# Linha de trade do dashboard: ícone, par, estratégia, cor do profit, profit
+_ROW_FMT = "{0} {1:12} | {2:12} | {3} {4:+6.2f}%"
+_TRADE_ROW_FIELDS = operator.itemgetter('status', 'strategy', 'profit_percent')
+
 
 class AdvancedMonitoringSystem:
+    _SEP80 = "=" * 80
+    _DASH80 = "-" * 80
+
     def __init__(self, config_file: str = "user_data/config.json"):
         self.config_file = config_file
         self.active_trades = {}
-        self.performance_data = []
-        self.alerts_log = []
+        self.performance_data = deque(maxlen=100)
+        self.alerts_log = deque(maxlen=1000)
+        self._alert_seq = 0
         self.risk_metrics = {}
         self.monitoring_active = False
+        self._stop_event = threading.Event()
+        # Protege active_trades e as colunas SoA (reentrante: saídas chamam _set_trade_status)
+        self._trades_lock = threading.RLock()
+        self._rng = np.random.default_rng()  # Variação simulada de preços
+
+        # Serialização e escrita dos backups fora das threads de monitoramento
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='backup-io')
+        self._pending_backup = None
+
+        # Colunas numéricas dos trades (SoA), alinhadas com self._pairs;
+        # os dicts de active_trades são atualizados só quando lidos (dashboard/backup)
+        self._pairs = []
+        self._pair_index = {}
+        self._entry = np.empty(0, dtype=np.float64)
+        self._current = np.empty(0, dtype=np.float64)
+        self._profit = np.empty(0, dtype=np.float64)
+        self._active = np.empty(0, dtype=bool)
+
         self.setup_logging()
 
     def setup_logging(self):
@@ -45,15 +212,19 @@ class AdvancedMonitoringSystem:
         self.logger = logging.getLogger("FreqTrade3_Monitor")
         self.logger.setLevel(logging.INFO)
 
-        # Handler para arquivo
-        file_handler = logging.FileHandler("logs/monitor_avancado.log")
+        # Handler para arquivo (aberto só no primeiro registro)
+        file_handler = logging.FileHandler("logs/monitor_avancado.log", delay=True)
         file_handler.setLevel(logging.INFO)
+        file_handler.terminator = '\n'
 
         # Formato
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(formatter)
 
-        self.logger.addHandler(file_handler)
+        # Buffer em memória: descarrega a cada 256 registros ou imediatamente em ERROR
+        self._log_buffer = logging.handlers.MemoryHandler(
+            capacity=256, flushLevel=logging.ERROR, target=file_handler)
+        self.logger.addHandler(self._log_buffer)
 
         print("[OK] Sistema de logging configurado")
 
@@ -70,111 +241,155 @@ class AdvancedMonitoringSystem:
         print("="*50)
 
         self.monitoring_active = True
+        self._stop_event.clear()
 
-        # Threads de monitoramento
-        threading.Thread(target=self.monitor_trades, daemon=True).start()
-        threading.Thread(target=self.monitor_performance, daemon=True).start()
-        threading.Thread(target=self.monitor_risk, daemon=True).start()
-        threading.Thread(target=self.generate_reports, daemon=True).start()
+        # Thread única de agendamento das tarefas de monitoramento
+        threading.Thread(target=self._run_scheduler, daemon=True).start()
 
         self.logger.info("Sistema de monitoramento iniciado")
         print("✅ Monitoramento ativo")
 
         # Loop principal
         try:
-            while self.monitoring_active:
+            while not self._stop_event.is_set():
                 self.display_dashboard()
-                time.sleep(30)  # Update a cada 30 segundos
+                self._stop_event.wait(30)  # Update a cada 30 segundos
         except KeyboardInterrupt:
             self.stop_monitoring()
 
     def stop_monitoring(self):
         """Parar sistema de monitoramento"""
         self.monitoring_active = False
+        self._stop_event.set()
         self.logger.info("Sistema de monitoramento parado")
+        if self._pending_backup is not None:
+            concurrent.futures.wait([self._pending_backup])
+        self._log_buffer.flush()
         print("\n🛑 Sistema de monitoramento parado")
 
-    def monitor_trades(self):
-        """Monitorar trades ativos"""
-        while self.monitoring_active:
-            try:
-                # Simular monitoramento de trades
-                self.update_trade_data()
-                self.check_entry_signals()
-                self.check_exit_signals()
-                time.sleep(10)  # Check a cada 10 segundos
-            except Exception as e:
-                self.logger.error(f"Erro no monitoramento de trades: {e}")
-                time.sleep(30)
-
-    def monitor_performance(self):
+    def _run_scheduler(self):
+        """Executar as tarefas periódicas numa única thread (heap por próxima execução)"""
+        now = time.monotonic()
+        tasks = [(now, order, tick) for order, tick in enumerate(
+            (self._trade_tick, self._perf_tick, self._risk_tick, self._report_tick))]
+        heapq.heapify(tasks)
+
+        while not self._stop_event.is_set():
+            next_run, order, tick = tasks[0]
+            if self._stop_event.wait(max(0.0, next_run - time.monotonic())):
+                break
+            interval = tick()
+            heapq.heapreplace(tasks, (time.monotonic() + interval, order, tick))
+
+    def _trade_tick(self) -> float:
+        """Monitorar trades ativos; devolve o intervalo até a próxima execução"""
+        try:
+            # Simular monitoramento de trades
+            self.update_trade_data()
+            self.check_entry_signals()
+            self.check_exit_signals()
+            return 10  # Check a cada 10 segundos
+        except Exception as e:
+            self.logger.error("Erro no monitoramento de trades: %s", e)
+            return 30
+
+    def _perf_tick(self) -> float:
         """Monitorar performance do bot"""
-        while self.monitoring_active:
-            try:
-                self.calculate_performance_metrics()
-                self.check_profit_targets()
-                time.sleep(60)  # Check a cada minuto
-            except Exception as e:
-                self.logger.error(f"Erro no monitoramento de performance: {e}")
-                time.sleep(60)
-
-    def monitor_risk(self):
+        try:
+            self.calculate_performance_metrics()
+            self.check_profit_targets()
+            return 60  # Check a cada minuto
+        except Exception as e:
+            self.logger.error("Erro no monitoramento de performance: %s", e)
+            return 60
+
+    def _risk_tick(self) -> float:
         """Monitorar risco do portfólio"""
-        while self.monitoring_active:
-            try:
-                self.calculate_risk_metrics()
-                self.check_risk_limits()
-                time.sleep(30)  # Check a cada 30 segundos
-            except Exception as e:
-                self.logger.error(f"Erro no monitoramento de risco: {e}")
-                time.sleep(60)
-
-    def generate_reports(self):
+        try:
+            self.calculate_risk_metrics()
+            self.check_risk_limits()
+            return 30  # Check a cada 30 segundos
+        except Exception as e:
+            self.logger.error("Erro no monitoramento de risco: %s", e)
+            return 60
+
+    def _report_tick(self) -> float:
         """Gerar relatórios automáticos"""
-        while self.monitoring_active:
-            try:
-                self.generate_daily_report()
-                self.backup_data()
-                time.sleep(3600)  # Relatório a cada hora
-            except Exception as e:
-                self.logger.error(f"Erro na geração de relatórios: {e}")
-                time.sleep(1800)
+        try:
+            self.generate_daily_report()
+            self.backup_data()
+            return 3600  # Relatório a cada hora
+        except Exception as e:
+            self.logger.error("Erro na geração de relatórios: %s", e)
+            return 1800
 
     def update_trade_data(self):
         """Atualizar dados de trades"""
-        # Simular dados de trades
-        if not self.active_trades:
-            # Simular trade ativo
-            self.active_trades['ETH/USDT'] = {
-                'strategy': 'EMA200RSI',
-                'entry_price': 3500.0,
-                'current_price': 3525.0,
-                'profit_percent': 0.71,
-                'amount': 0.03,
-                'timestamp': datetime.now().isoformat(),
-                'status': 'ATIVO'
-            }
-
-            self.active_trades['BTC/USDT'] = {
-                'strategy': 'MACDStrategy',
-                'entry_price': 45000.0,
-                'current_price': 45200.0,
-                'profit_percent': 0.44,
-                'amount': 0.002,
-                'timestamp': datetime.now().isoformat(),
-                'status': 'ATIVO'
-            }
-
-        # Atualizar preços simulados
-        for pair, trade in self.active_trades.items():
-            if trade['status'] == 'ATIVO':
-                # Simular variação de preço
-                variation = (0.5 - 1.0) / 100  # Variação de -0.5% a +0.5%
-                price_change = trade['current_price'] * variation
-                trade['current_price'] += price_change
-
-                # Recalcular profit
-                trade['profit_percent'] = ((trade['current_price'] - trade['entry_price']) / trade['entry_price']) * 100
+        with self._trades_lock:
+            # Simular dados de trades
+            if not self.active_trades:
+                # Simular trade ativo
+                self._add_trade('ETH/USDT', {
+                    'strategy': 'EMA200RSI',
+                    'entry_price': 3500.0,
+                    'current_price': 3525.0,
+                    'profit_percent': 0.71,
+                    'amount': 0.03,
+                    'timestamp': datetime.now().isoformat(),
+                    'status': 'ATIVO'
+                })
+
+                self._add_trade('BTC/USDT', {
+                    'strategy': 'MACDStrategy',
+                    'entry_price': 45000.0,
+                    'current_price': 45200.0,
+                    'profit_percent': 0.44,
+                    'amount': 0.002,
+                    'timestamp': datetime.now().isoformat(),
+                    'status': 'ATIVO'
+                })
+
+            # Atualizar preços simulados dos trades ativos (vetorizado)
+            active = self._active
+            variation = self._rng.uniform(-0.005, 0.005, int(np.count_nonzero(active)))  # -0.5% a +0.5%
+            self._current[active] *= 1.0 + variation
+
+            # Recalcular profit
+            entry = self._entry[active]
+            self._profit[active] = ((self._current[active] - entry) / entry) * 100
+
+    def _add_trade(self, pair: str, trade: Dict):
+        """Registar trade no dict e nas colunas numéricas"""
+        if pair in self._pair_index:
+            index = self._pair_index[pair]
+        else:
+            index = len(self._pairs)
+            self._pairs.append(pair)
+            self._pair_index[pair] = index
+            self._entry = np.append(self._entry, 0.0)
+            self._current = np.append(self._current, 0.0)
+            self._profit = np.append(self._profit, 0.0)
+            self._active = np.append(self._active, False)
+
+        self.active_trades[pair] = trade
+        self._entry[index] = trade['entry_price']
+        self._current[index] = trade['current_price']
+        self._profit[index] = trade['profit_percent']
+        self._active[index] = trade['status'] == 'ATIVO'
+
+    def _set_trade_status(self, pair: str, status: str):
+        """Alterar status do trade (dict e máscara de ativos)"""
+        with self._trades_lock:
+            self.active_trades[pair]['status'] = status
+            self._active[self._pair_index[pair]] = status == 'ATIVO'
+
+    def _materialize_trades(self):
+        """Copiar preço/profit atuais das colunas para os dicts de active_trades"""
+        with self._trades_lock:
+            for index, pair in enumerate(self._pairs):
+                trade = self.active_trades[pair]
+                trade['current_price'] = float(self._current[index])
+                trade['profit_percent'] = float(self._profit[index])
 
     def check_entry_signals(self):
         """Verificar sinais de entrada"""
@@ -192,52 +407,58 @@ class AdvancedMonitoringSystem:
                     'signal': signal['signal'],
                     'confidence': signal['confidence'],
                     'reason': signal['reason'],
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': datetime.now().isoformat(),
+                    'ts': time.time()
                 }
                 self.handle_alert(alert)
 
     def check_exit_signals(self):
         """Verificar sinais de saída"""
-        for pair, trade in self.active_trades.items():
-            if trade['status'] == 'ATIVO':
-                # Verificar stop loss
-                if trade['profit_percent'] < -2.0:  # Stop loss em -2%
-                    trade['status'] = 'STOP_LOSS'
-                    self.handle_alert({
-                        'type': 'STOP_LOSS',
-                        'pair': pair,
-                        'profit': trade['profit_percent'],
-                        'timestamp': datetime.now().isoformat()
-                    })
-
-                # Verificar take profit
-                elif trade['profit_percent'] > 5.0:  # Take profit em +5%
-                    trade['status'] = 'TAKE_PROFIT'
-                    self.handle_alert({
-                        'type': 'TAKE_PROFIT',
-                        'pair': pair,
-                        'profit': trade['profit_percent'],
-                        'timestamp': datetime.now().isoformat()
-                    })
+        # Verificar stop loss (-2%) e take profit (+5%) sobre as colunas;
+        # os alertas são emitidos fora do lock
+        exits = []
+        with self._trades_lock:
+            profit = self._profit
+            codes = _scan_exits(profit, self._active)
+            for index in np.flatnonzero(codes):
+                pair = self._pairs[index]
+                alert_type = 'STOP_LOSS' if codes[index] == EXIT_STOP_LOSS else 'TAKE_PROFIT'
+                self._set_trade_status(pair, alert_type)
+                exits.append((pair, alert_type, float(profit[index])))
+
+        for pair, alert_type, trade_profit in exits:
+            self.handle_alert({
+                'type': alert_type,
+                'pair': pair,
+                'profit': trade_profit,
+                'timestamp': datetime.now().isoformat(),
+                'ts': time.time()
+            })
 
     def calculate_performance_metrics(self):
         """Calcular métricas de performance"""
         if not self.active_trades:
             return
 
-        total_profit = sum(trade['profit_percent'] for trade in self.active_trades.values() if trade['status'] == 'ATIVO')
-        win_count = len([t for t in self.active_trades.values() if t['status'] == 'ATIVO' and t['profit_percent'] > 0])
-        lose_count = len([t for t in self.active_trades.values() if t['status'] == 'ATIVO' and t['profit_percent'] < 0])
+        # Reduções sobre o profit dos trades ativos (cópia feita sob o lock)
+        with self._trades_lock:
+            profit = self._profit[self._active]
+            trade_count = len(self.active_trades)
+        total_profit = float(profit.sum())
+        win_count = int(np.count_nonzero(profit > 0))
+        lose_count = int(np.count_nonzero(profit < 0))
+
+        win_rate = (win_count / (win_count + lose_count or 1)) * 100
 
         self.performance_data.append({
             'timestamp': datetime.now().isoformat(),
             'total_profit': total_profit,
-            'active_trades': len(self.active_trades),
-            'win_rate': (win_count / max(1, win_count + lose_count)) * 100,
-            'average_profit': total_profit / max(1, len(self.active_trades))
+            'active_trades': trade_count,
+            'win_rate': win_rate,
+            'average_profit': total_profit / max(1, trade_count)
         })
 
-        self.logger.info(f"Performance: {total_profit:.2f}%, Win Rate: {(win_count / max(1, win_count + lose_count)) * 100:.1f}%")
+        self.logger.info("Performance: %.2f%%, Win Rate: %.1f%%", total_profit, win_rate)
 
     def check_profit_targets(self):
         """Verificar alvos de profit"""
@@ -248,14 +469,16 @@ class AdvancedMonitoringSystem:
         if not self.active_trades:
             return
 
-        total_exposure = sum(abs(trade['profit_percent']) for trade in self.active_trades.values())
-        max_loss = min((trade['profit_percent'] for trade in self.active_trades.values()), default=0)
+        # Exposição, perda máxima, score (0-100) e VaR 95% num único kernel
+        with self._trades_lock:
+            profit = self._profit.copy()
+        total_exposure, max_loss, risk_score, var_95 = _risk_kernel(profit)
 
         self.risk_metrics = {
             'total_exposure': total_exposure,
             'max_loss': max_loss,
-            'risk_score': min(100, abs(max_loss) * 10),  # Score de 0-100
-            'var_95': abs(max_loss) * 1.65  # Value at Risk 95%
+            'risk_score': risk_score,  # Score de 0-100
+            'var_95': var_95  # Value at Risk 95%
         }
 
     def check_risk_limits(self):
@@ -265,16 +488,19 @@ class AdvancedMonitoringSystem:
                 'type': 'HIGH_RISK',
                 'risk_score': self.risk_metrics['risk_score'],
                 'message': 'Risco elevado detectado! Considere reduzir posições.',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': datetime.now().isoformat(),
+                'ts': time.time()
             })
 
     def handle_alert(self, alert: Dict):
         """Processar alertas"""
-        alert['id'] = len(self.alerts_log)
+        alert.setdefault('ts', time.time())
+        alert['id'] = self._alert_seq
+        self._alert_seq += 1
         self.alerts_log.append(alert)
 
         # Log do alerta
-        self.logger.warning(f"ALERTA {alert['type']}: {alert.get('message', '')}")
+        self.logger.warning("ALERTA %s: %s", alert['type'], alert.get('message', ''))
 
         # Ações automáticas baseadas no tipo
         if alert['type'] == 'HIGH_RISK':
@@ -295,8 +521,8 @@ class AdvancedMonitoringSystem:
         """Gerir posições automaticamente"""
         pair = alert.get('pair')
         if pair in self.active_trades:
-            self.active_trades[pair]['status'] = 'CLOSED'
-            self.logger.info(f"Posição {pair} fechada automaticamente")
+            self._set_trade_status(pair, 'CLOSED')
+            self.logger.info("Posição %s fechada automaticamente", pair)
 
     def generate_daily_report(self):
         """Gerar relatório diário"""
@@ -316,91 +542,118 @@ class AdvancedMonitoringSystem:
         # Salvar relatório
         os.makedirs("reports", exist_ok=True)
         filename = f"reports/daily_report_{report['date']}.json"
-        with open(filename, 'w') as f:
-            json.dump(report, f, indent=2)
+        _write_json(filename, report)
 
         print(f"📊 Relatório diário salvo: {filename}")
-        self.logger.info(f"Relatório diário gerado: {filename}")
+        self.logger.info("Relatório diário gerado: %s", filename)
 
     def backup_data(self):
         """Fazer backup dos dados"""
+        # Snapshot barato; a serialização acontece na thread de I/O
+        with self._trades_lock:
+            self._materialize_trades()
+            trades = {pair: dict(trade) for pair, trade in self.active_trades.items()}
         backup_data = {
-            'active_trades': self.active_trades,
-            'performance_data': self.performance_data[-100:],  # Últimos 100
-            'alerts_log': self.alerts_log[-1000:],  # Últimos 1000
-            'risk_metrics': self.risk_metrics,
+            'active_trades': trades,
+            'performance_data': list(self.performance_data),  # Últimos 100
+            'alerts_log': list(self.alerts_log),  # Últimos 1000
+            'risk_metrics': dict(self.risk_metrics),
             'backup_timestamp': datetime.now().isoformat()
         }
 
         os.makedirs("backups", exist_ok=True)
         filename = f"backups/backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w') as f:
-            json.dump(backup_data, f, indent=2)
+        self._pending_backup = self._io_pool.submit(self._write_backup, filename, backup_data)
 
-        self.logger.info(f"Backup criado: {filename}")
+    def _write_backup(self, filename: str, backup_data: Dict):
+        """Serializar e gravar um backup (executado na thread de I/O)"""
+        try:
+            _write_json(filename, backup_data)
+            self.logger.info("Backup criado: %s", filename)
+            self._rotate_backups(os.path.dirname(filename))
+        except Exception as e:
+            self.logger.error("Erro ao gravar backup: %s", e)
+
+    def _rotate_backups(self, backup_dir: str, keep: int = BACKUP_KEEP):
+        """Remover backups antigos, mantendo apenas os `keep` mais recentes"""
+        with os.scandir(backup_dir) as entries:
+            backups = [(entry.stat().st_mtime, entry.path) for entry in entries
+                       if entry.name.startswith('backup_') and entry.name.endswith('.json')]
+
+        excess = len(backups) - keep
+        if excess <= 0:
+            return
+
+        for _, path in heapq.nsmallest(excess, backups):
+            os.remove(path)
 
     def display_dashboard(self):
         """Exibir dashboard de monitoramento"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        _clear_screen()
+        with self._trades_lock:
+            self._materialize_trades()
+            trades = tuple(self.active_trades.items())
+        now = datetime.now()
+
+        # Linhas acumuladas e escritas de uma só vez no final
+        lines = []
+        emit = lines.append
 
-        print("\n" + "="*80)
-        print("📊 FREQTRADE3 - SISTEMA DE MONITORAMENTO AVANÇADO")
-        print("="*80)
+        emit("\n" + self._SEP80)
+        emit("📊 FREQTRADE3 - SISTEMA DE MONITORAMENTO AVANÇADO")
+        emit(self._SEP80)
 
         # Status geral
-        print(f"🕐 Última atualização: {datetime.now().strftime('%H:%M:%S')}")
-        print(f"🎯 Status: {'🟢 ATIVO' if self.monitoring_active else '🔴 INATIVO'}")
-        print(f"📈 Trades Ativos: {len(self.active_trades)}")
+        emit(f"🕐 Última atualização: {now.strftime('%H:%M:%S')}")
+        emit(f"🎯 Status: {'🟢 ATIVO' if self.monitoring_active else '🔴 INATIVO'}")
+        emit(f"📈 Trades Ativos: {len(trades)}")
 
         # Trades ativos
-        if self.active_trades:
-            print("\n📋 TRADES ATIVOS:")
-            print("-" * 80)
-            for pair, trade in self.active_trades.items():
-                status_icon = "🟢" if trade['status'] == 'ATIVO' else "🔴"
-                profit_color = "🟢" if trade['profit_percent'] >= 0 else "🔴"
-                print(f"{status_icon} {pair:12} | {trade['strategy']:12} | {profit_color} {trade['profit_percent']:+6.2f}%")
+        if trades:
+            emit("\n📋 TRADES ATIVOS:")
+            emit(self._DASH80)
+            for pair, trade in trades:
+                status, strategy, profit = _TRADE_ROW_FIELDS(trade)
+                status_icon = _STATUS_ICONS.get(status, '🔴')
+                profit_color = _PROFIT_ICONS[profit < 0]
+                emit(_ROW_FMT.format(status_icon, pair, strategy, profit_color, profit))
 
         # Performance
         if self.performance_data:
             latest = self.performance_data[-1]
-            print(f"\n📊 PERFORMANCE:")
-            print(f"   💰 Profit Total: {latest['total_profit']:+6.2f}%")
-            print(f"   🎯 Win Rate: {latest['win_rate']:5.1f}%")
-            print(f"   📈 Trade Médio: {latest['average_profit']:+6.2f}%")
+            emit(f"\n📊 PERFORMANCE:")
+            emit(f"   💰 Profit Total: {latest['total_profit']:+6.2f}%")
+            emit(f"   🎯 Win Rate: {latest['win_rate']:5.1f}%")
+            emit(f"   📈 Trade Médio: {latest['average_profit']:+6.2f}%")
 
         # Risco
         if self.risk_metrics:
             risk_level = "🟢 BAIXO" if self.risk_metrics['risk_score'] < 30 else "🟡 MÉDIO" if self.risk_metrics['risk_score'] < 70 else "🔴 ALTO"
-            print(f"\n🛡️ GESTÃO DE RISCO:")
-            print(f"   📊 Score de Risco: {self.risk_metrics['risk_score']:3.0f} | {risk_level}")
-            print(f"   📉 Max Loss: {self.risk_metrics['max_loss']:+6.2f}%")
-            print(f"   💹 VaR 95%: {self.risk_metrics['var_95']:+6.2f}%")
+            emit(f"\n🛡️ GESTÃO DE RISCO:")
+            emit(f"   📊 Score de Risco: {self.risk_metrics['risk_score']:3.0f} | {risk_level}")
+            emit(f"   📉 Max Loss: {self.risk_metrics['max_loss']:+6.2f}%")
+            emit(f"   💹 VaR 95%: {self.risk_metrics['var_95']:+6.2f}%")
 
         # Alertas recentes
-        recent_alerts = [a for a in self.alerts_log[-5:]]
+        total_alerts = len(self.alerts_log)
+        recent_alerts = list(itertools.islice(self.alerts_log, max(0, total_alerts - 5), total_alerts))
         if recent_alerts:
-            print(f"\n🚨 ALERTAS RECENTES:")
+            emit(f"\n🚨 ALERTAS RECENTES:")
             for alert in recent_alerts:
-                icon = self.get_alert_icon(alert['type'])
-                time_str = datetime.fromisoformat(alert['timestamp']).strftime('%H:%M:%S')
-                print(f"   {icon} {time_str} | {alert['type']} | {alert.get('pair', 'N/A')}")
+                icon = _ALERT_ICONS.get(alert['type'], '📢')
+                time_str = time.strftime('%H:%M:%S', time.localtime(alert['ts']))
+                emit(f"   {icon} {time_str} | {alert['type']} | {alert.get('pair', 'N/A')}")
 
-        print("="*80)
-        print("Pressione Ctrl+C para parar...")
-        print("="*80)
+        emit(self._SEP80)
+        emit("Pressione Ctrl+C para parar...")
+        emit(self._SEP80)
+
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def get_alert_icon(self, alert_type: str) -> str:
         """Obter ícone para tipo de alerta"""
-        icons = {
-            'ENTRY_SIGNAL': '🟢',
-            'EXIT_SIGNAL': '🔴',
-            'STOP_LOSS': '🛑',
-            'TAKE_PROFIT': '💰',
-            'HIGH_RISK': '🚨',
-            'INFO': 'ℹ️'
-        }
-        return icons.get(alert_type, '📢')
+        return _ALERT_ICONS.get(alert_type, '📢')
 
     def execute_strategy_test(self, strategy: str, pair: str):
         """Executar teste de estratégia em background"""
@@ -408,9 +661,11 @@ class AdvancedMonitoringSystem:
             try:
                 print(f"🧪 Iniciando teste: {strategy} em {pair}")
 
-                # Executar backtest
-                cmd = f"freqtrade backtesting --strategy {strategy} --pairs {pair}"
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
+                # Executar backtest sem shell (argv direto, sem interpolação de comando)
+                cmd = [sys.executable, '-m', 'freqtrade', 'backtesting',
+                       '--strategy', strategy, '--pairs', pair]
+                result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                        text=True, timeout=60)
 
                 if result.returncode == 0:
                     print(f"✅ Teste concluído: {strategy} em {pair}")
@@ -419,7 +674,8 @@ class AdvancedMonitoringSystem:
                         'strategy': strategy,
                         'pair': pair,
                         'result': 'SUCCESS',
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': datetime.now().isoformat(),
+                        'ts': time.time()
                     })
                 else:
                     print(f"❌ Teste falhou: {strategy} em {pair}")
@@ -428,12 +684,13 @@ class AdvancedMonitoringSystem:
                         'strategy': strategy,
                         'pair': pair,
                         'error': result.stderr,
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': datetime.now().isoformat(),
+                        'ts': time.time()
                     })
 
             except Exception as e:
                 print(f"💥 Erro no teste: {e}")
-                self.logger.error(f"Erro no teste de estratégia: {e}")
+                self.logger.error("Erro no teste de estratégia: %s", e)
 
         # Executar em background
         threading.Thread(target=run_test, daemon=True).start()
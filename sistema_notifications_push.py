@@ -5,33 +5,280 @@ Versão: 4.0 - Notificações Push Avançadas
 Características: Firebase FCM, Web Push, Service Worker, templates, gestão de dispositivos
 """
 
+import asyncio
 import base64
+import functools
 import hashlib
 import hmac
 import json
 import logging
+import math
 import os
+import re
 import sqlite3
 import ssl
+import tempfile
 import threading
 import time
+import weakref
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 
+import httpx
 import pywebpush
 import requests
+from py_vapid import Vapid
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ec
+
+try:
+    import h2  # noqa: F401 - necessário para HTTP/2 no httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from google.auth.transport.requests import Request as GoogleAuthRequest
+    from google.oauth2 import service_account
+    GOOGLE_AUTH_AVAILABLE = True
+except ImportError:
+    GOOGLE_AUTH_AVAILABLE = False
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+FCM_SEND_URL = 'https://fcm.googleapis.com/v1/projects/{project_id}/messages:send'
+FCM_SCOPES = ['https://www.googleapis.com/auth/firebase.messaging']
+FCM_STREAMS_PER_CONNECTION = 100  # Streams HTTP/2 simultâneos por conexão
+FCM_TOKEN_REFRESH_MARGIN = 60  # segundos antes da expiração do token OAuth2
+VAPID_JWT_LIFETIME = 12 * 3600  # JWT VAPID reutilizado por origem (máx. 24h)
+VAPID_JWT_REFRESH_MARGIN = 60
+
+PUSH_DDL = '''
+    CREATE TABLE IF NOT EXISTS push_subscriptions (
+        id TEXT PRIMARY KEY,
+        endpoint TEXT UNIQUE,
+        p256dh TEXT,
+        auth TEXT,
+        device_type TEXT,
+        user_agent TEXT,
+        device_id TEXT,
+        user_id TEXT,
+        created_at TEXT,
+        last_used TEXT,
+        active BOOLEAN,
+        metadata TEXT
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS push_messages (
+        id TEXT PRIMARY KEY,
+        title TEXT,
+        body TEXT,
+        icon TEXT,
+        badge TEXT,
+        image TEXT,
+        click_action TEXT,
+        data TEXT,
+        type TEXT,
+        priority TEXT,
+        ttl INTEGER,
+        sent_at TEXT,
+        success_count INTEGER,
+        failure_count INTEGER,
+        provider_responses TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS device_tokens (
+        id TEXT PRIMARY KEY,
+        token TEXT,
+        platform TEXT,
+        app_version TEXT,
+        user_id TEXT,
+        active BOOLEAN,
+        last_seen TEXT,
+        metadata TEXT
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_push_subs_user_active ON push_subscriptions(user_id, active);
+    CREATE INDEX IF NOT EXISTS idx_push_subs_active_partial ON push_subscriptions(id) WHERE active = 1;
+    CREATE INDEX IF NOT EXISTS idx_push_msgs_sent_at ON push_messages(sent_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_device_tokens_user ON device_tokens(user_id, active);
+'''
+
+LOAD_SUBSCRIPTIONS_SQL = '''
+    SELECT id, endpoint, p256dh, auth, device_type, user_agent,
+           device_id, user_id, created_at, last_used, active, metadata
+    FROM push_subscriptions
+    WHERE active = 1
+'''
+
+SAVE_SUBSCRIPTION_SQL = '''
+    INSERT OR REPLACE INTO push_subscriptions
+    (id, endpoint, p256dh, auth, device_type, user_agent,
+     device_id, user_id, created_at, last_used, active, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+UPDATE_LAST_USED_SQL = 'UPDATE push_subscriptions SET last_used = ? WHERE id = ?'
+
+SAVE_MESSAGE_SQL = '''
+    INSERT INTO push_messages
+    (id, title, body, icon, badge, image, click_action, data,
+     type, priority, ttl, sent_at, success_count, failure_count, provider_responses)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+# Service Worker servido para Web Push (gravado em push_data/service-worker.js)
+SERVICE_WORKER_JS = '''
+const CACHE_NAME = 'freqtrade3-push-v1';
+const urlsToCache = [
+  '/',
+  '/static/css/main.css',
+  '/static/js/main.js',
+  '/icons/icon-192x192.png'
+];
+
+self.addEventListener('install', function(event) {
+  event.waitUntil(
+    caches.open(CACHE_NAME)
+      .then(function(cache) {
+        return cache.addAll(urlsToCache);
+      })
+  );
+});
+
+self.addEventListener('fetch', function(event) {
+  event.respondWith(
+    caches.match(event.request)
+      .then(function(response) {
+        // Cache hit - return response
+        if (response) {
+          return response;
+        }
+        return fetch(event.request);
+      }
+    )
+  );
+});
+
+// Push notification handler
+self.addEventListener('push', function(event) {
+  const options = {
+    body: event.data ? event.data.text() : 'Nova notificação do FreqTrade3',
+    icon: '/icons/icon-192x192.png',
+    badge: '/icons/badge-72x72.png',
+    vibrate: [100, 50, 100],
+    data: {
+      dateOfArrival: Date.now(),
+      primaryKey: 1
+    },
+    actions: [
+      {
+        action: 'explore',
+        title: 'Ver Detalhes',
+        icon: '/icons/checkmark.png'
+      },
+      {
+        action: 'close',
+        title: 'Fechar',
+        icon: '/icons/xmark.png'
+      }
+    ]
+  };
+
+  event.waitUntil(
+    self.registration.showNotification('FreqTrade3', options)
+  );
+});
+
+// Notification click handler
+self.addEventListener('notificationclick', function(event) {
+  event.notification.close();
+
+  if (event.action === 'explore') {
+    event.waitUntil(
+      clients.openWindow('/dashboard')
+    );
+  } else if (event.action === 'close') {
+    // Just close the notification
+  } else {
+    // Default action - open dashboard
+    event.waitUntil(
+      clients.openWindow('/')
+    );
+  }
+});
+
+// Background sync for offline notifications
+self.addEventListener('sync', function(event) {
+  if (event.tag === 'background-sync') {
+    event.waitUntil(
+      // Sync pending notifications
+      syncPendingNotifications()
+    );
+  }
+});
+
+function syncPendingNotifications() {
+  return fetch('/api/push/sync', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    }
+  });
+}
+'''
+SERVICE_WORKER_SHA256 = hashlib.sha256(SERVICE_WORKER_JS.encode('utf-8')).digest()
+
+
+def _b64url_encode(data: bytes) -> str:
+    """Codificar em base64url sem padding"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _is_p256_public_key(public_key: str) -> bool:
+    """Verificar se a chave pública é um ponto P-256 não comprimido (65 bytes)"""
+    try:
+        raw = base64.urlsafe_b64decode(public_key + '=' * (-len(public_key) % 4))
+    except (ValueError, TypeError):
+        return False
+    return len(raw) == 65 and raw[0] == 4
+
+
+class _AsyncRateLimiter:
+    """Token bucket assíncrono: até `rate` envios por `period` segundos"""
+
+    def __init__(self, rate: float, period: float = 1.0):
+        self._capacity = rate
+        self._refill = rate / period
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Aguardar até haver um token disponível"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._refill)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._refill)
+
 class NotificationType(Enum):
     """Tipos de notificação"""
     TRADE_EXECUTION = "trade_execution"
@@ -51,6 +298,15 @@ class PushProvider(Enum):
     APNS = "apns"  # Apple Push Notification Service
     FCM = "fcm"    # Firebase Cloud Messaging
 
+_FCM_ENDPOINT_RE = re.compile(r'fcm|firebase', re.IGNORECASE)
+
+def _classify_provider(endpoint: str) -> PushProvider:
+    """Detectar provedor pelo endpoint (calculado uma vez por subscrição)"""
+    if _FCM_ENDPOINT_RE.search(endpoint):
+        return PushProvider.FCM
+    # webpush/mozilla/chrome e restantes endpoints: Web Push
+    return PushProvider.WEB_PUSH
+
 @dataclass
 class PushSubscription:
     """Subscrição de push notification"""
@@ -62,6 +318,7 @@ class PushSubscription:
     created_at: str
     last_used: str
     active: bool
+    provider: PushProvider = PushProvider.WEB_PUSH
 
 @dataclass
 class PushMessage:
@@ -94,12 +351,45 @@ class PushNotificationSystem:
 
         # Estado interno
         self.subscriptions = {}
+        self._by_endpoint = {}  # endpoint -> id da subscrição
         self.notification_history = deque(maxlen=10000)
         self.devices = {}
 
+        # Uma conexão SQLite por thread viva (fechada quando a thread termina)
+        self._connections = weakref.WeakKeyDictionary()  # thread -> conexão
+        self._connections_lock = threading.Lock()
+
+        # Loop asyncio dedicado aos envios; o cliente HTTP/2 vive nele
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        self._http = None
+        self._closed = False  # close() é definitivo
+
+        # Token OAuth2 do FCM v1 (cacheado até perto da expiração)
+        self._fcm_credentials = None
+        self._fcm_access_token = None
+        self._fcm_token_expiry = 0.0
+        self._fcm_token_lock = asyncio.Lock()
+
+        # Headers VAPID assinados por origem do endpoint: aud -> (headers, exp)
+        self._vapid = None
+        self._vapid_jwt_cache = {}
+        self._vapid_lock = threading.Lock()
+
         # Configurações
         self.config = self._load_config()
 
+        # Sessão HTTP com pool de conexões keep-alive (usada pelo pywebpush)
+        self._http_session = self._create_http_session()
+
+        # Threads para envios bloqueantes (pywebpush): um lote inteiro em paralelo
+        self._pool = ThreadPoolExecutor(max_workers=self.config['settings']['batch_size'],
+                                        thread_name_prefix='push-io')
+
+        # Ritmo de envio: token bucket em vez de pausas fixas entre lotes
+        self._rate_limiter = _AsyncRateLimiter(self.config['settings'].get('max_send_rate', 500))
+
         # Provedores
         self.providers = self._init_providers()
 
@@ -125,68 +415,27 @@ class PushNotificationSystem:
     def _init_database(self):
         """Inicializar base de dados de push"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Tabela de subscrições
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS push_subscriptions (
-                    id TEXT PRIMARY KEY,
-                    endpoint TEXT UNIQUE,
-                    p256dh TEXT,
-                    auth TEXT,
-                    device_type TEXT,
-                    user_agent TEXT,
-                    device_id TEXT,
-                    user_id TEXT,
-                    created_at TEXT,
-                    last_used TEXT,
-                    active BOOLEAN,
-                    metadata TEXT
-                )
-            ''')
-
-            # Tabela de mensagens enviadas
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS push_messages (
-                    id TEXT PRIMARY KEY,
-                    title TEXT,
-                    body TEXT,
-                    icon TEXT,
-                    badge TEXT,
-                    image TEXT,
-                    click_action TEXT,
-                    data TEXT,
-                    type TEXT,
-                    priority TEXT,
-                    ttl INTEGER,
-                    sent_at TEXT,
-                    success_count INTEGER,
-                    failure_count INTEGER,
-                    provider_responses TEXT
-                )
-            ''')
-
-            # Tabela de tokens de dispositivos
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS device_tokens (
-                    id TEXT PRIMARY KEY,
-                    token TEXT,
-                    platform TEXT,
-                    app_version TEXT,
-                    user_id TEXT,
-                    active BOOLEAN,
-                    last_seen TEXT,
-                    metadata TEXT
-                )
-            ''')
-
-            conn.commit()
-            conn.close()
+            self._conn().executescript(PUSH_DDL)
 
         except Exception as e:
             print(f"❌ Erro ao inicializar database de push: {e}")
 
+    def _conn(self) -> sqlite3.Connection:
+        """Conexão SQLite da thread atual (aberta uma vez, em modo WAL)"""
+        thread = threading.current_thread()
+        conn = self._connections.get(thread)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA mmap_size=268435456')
+            with self._connections_lock:
+                self._connections[thread] = conn
+            # Hosts com uma thread por pedido: não acumular handles abertos
+            weakref.finalize(thread, conn.close)
+        return conn
+
     def _load_config(self) -> Dict[str, Any]:
         """Carregar configurações de push"""
         default_config = {
@@ -195,7 +444,8 @@ class PushNotificationSystem:
                 'server_key': '',
                 'sender_id': '',
                 'project_id': '',
-                'api_key': ''
+                'api_key': '',
+                'credentials_path': ''  # JSON da service account (FCM HTTP v1)
             },
             'web_push': {
                 'enabled': True,
@@ -209,7 +459,8 @@ class PushNotificationSystem:
                 'max_retries': 3,
                 'retry_delay': 5,  # segundos
                 'batch_size': 100,
-                'rate_limit': 1000  # mensagens por hora
+                'rate_limit': 1000,  # mensagens por hora
+                'max_send_rate': 500  # envios por segundo (token bucket)
             },
             'templates': {
                 NotificationType.TRADE_EXECUTION: {
@@ -254,6 +505,18 @@ class PushNotificationSystem:
             print(f"⚠️  Erro ao carregar configuração de push: {e}")
             return default_config
 
+    def _create_http_session(self) -> requests.Session:
+        """Criar sessão requests com pool dimensionado ao lote e retries"""
+        settings = self.config['settings']
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=64,
+            pool_maxsize=settings['batch_size'],
+            max_retries=Retry(total=settings['max_retries'], backoff_factor=settings['retry_delay'])
+        )
+        session.mount('https://', adapter)
+        return session
+
     def _init_providers(self) -> Dict[PushProvider, Callable]:
         """Inicializar provedores de push"""
         return {
@@ -263,190 +526,84 @@ class PushNotificationSystem:
         }
 
     def _create_service_worker(self):
-        """Criar Service Worker para Web Push"""
-        service_worker_content = '''
-const CACHE_NAME = 'freqtrade3-push-v1';
-const urlsToCache = [
-  '/',
-  '/static/css/main.css',
-  '/static/js/main.js',
-  '/icons/icon-192x192.png'
-];
-
-self.addEventListener('install', function(event) {
-  event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(function(cache) {
-        return cache.addAll(urlsToCache);
-      })
-  );
-});
-
-self.addEventListener('fetch', function(event) {
-  event.respondWith(
-    caches.match(event.request)
-      .then(function(response) {
-        // Cache hit - return response
-        if (response) {
-          return response;
-        }
-        return fetch(event.request);
-      }
-    )
-  );
-});
-
-// Push notification handler
-self.addEventListener('push', function(event) {
-  const options = {
-    body: event.data ? event.data.text() : 'Nova notificação do FreqTrade3',
-    icon: '/icons/icon-192x192.png',
-    badge: '/icons/badge-72x72.png',
-    vibrate: [100, 50, 100],
-    data: {
-      dateOfArrival: Date.now(),
-      primaryKey: 1
-    },
-    actions: [
-      {
-        action: 'explore',
-        title: 'Ver Detalhes',
-        icon: '/icons/checkmark.png'
-      },
-      {
-        action: 'close',
-        title: 'Fechar',
-        icon: '/icons/xmark.png'
-      }
-    ]
-  };
-
-  event.waitUntil(
-    self.registration.showNotification('FreqTrade3', options)
-  );
-});
-
-// Notification click handler
-self.addEventListener('notificationclick', function(event) {
-  event.notification.close();
-
-  if (event.action === 'explore') {
-    event.waitUntil(
-      clients.openWindow('/dashboard')
-    );
-  } else if (event.action === 'close') {
-    // Just close the notification
-  } else {
-    // Default action - open dashboard
-    event.waitUntil(
-      clients.openWindow('/')
-    );
-  }
-});
+        """Criar Service Worker para Web Push (só regrava se o conteúdo mudou)"""
+        service_worker_file = os.path.join(self.push_data_dir, 'service-worker.js')
 
-// Background sync for offline notifications
-self.addEventListener('sync', function(event) {
-  if (event.tag === 'background-sync') {
-    event.waitUntil(
-      // Sync pending notifications
-      syncPendingNotifications()
-    );
-  }
-});
+        if os.path.exists(service_worker_file):
+            with open(service_worker_file, 'rb') as f:
+                if hashlib.sha256(f.read()).digest() == SERVICE_WORKER_SHA256:
+                    return
 
-function syncPendingNotifications() {
-  return fetch('/api/push/sync', {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    }
-  });
-}
-'''
-
-        service_worker_file = os.path.join(self.push_data_dir, 'service-worker.js')
-        with open(service_worker_file, 'w', encoding='utf-8') as f:
-            f.write(service_worker_content)
+        # Escrita atômica: processos concorrentes nunca veem o ficheiro parcial
+        with tempfile.NamedTemporaryFile(dir=self.push_data_dir, delete=False) as f:
+            f.write(SERVICE_WORKER_JS.encode('utf-8'))
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, service_worker_file)
 
         print("📄 Service Worker criado")
 
     def _init_vapid_keys(self):
-        """Inicializar chaves VAPID para Web Push"""
+        """Inicializar chaves VAPID (ECDSA P-256) para Web Push"""
         vapid_file = os.path.join(self.certs_dir, 'vapid_keys.json')
 
-        if not os.path.exists(vapid_file):
-            # Gerar novas chaves VAPID
+        if os.path.exists(vapid_file):
+            # Carregar chaves existentes
             try:
-                private_key = rsa.generate_private_key(
-                    public_exponent=65537,
-                    key_size=2048,
-                    backend=default_backend()
-                )
+                with open(vapid_file, 'r') as f:
+                    vapid_keys = json.load(f)
 
-                public_key = private_key.public_key()
+                if _is_p256_public_key(vapid_keys['publicKey']):
+                    self.config['web_push']['vapid_public_key'] = vapid_keys['publicKey']
+                    self.config['web_push']['vapid_private_key'] = vapid_keys['privateKey']
 
-                # Serializar chaves
-                private_pem = private_key.private_bytes(
-                    encoding=serialization.Encoding.PEM,
-                    format=serialization.PrivateFormat.PKCS8,
-                    encryption_algorithm=serialization.NoEncryption()
-                )
+                    print("🔑 Chaves VAPID carregadas")
+                    return
 
-                public_pem = public_key.public_bytes(
-                    encoding=serialization.Encoding.PEM,
-                    format=serialization.PublicFormat.SubjectPublicKeyInfo
-                )
+                # Chaves RSA de versões anteriores não são aceites pelo Web Push
+                print("⚠️  Chaves VAPID inválidas (não P-256), gerando novas")
 
-                # Converter para base64url
-                def b64url_encode(data):
-                    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+            except Exception as e:
+                print(f"❌ Erro ao carregar chaves VAPID: {e}")
+                return
 
-                vapid_keys = {
-                    'publicKey': b64url_encode(public_pem),
-                    'privateKey': b64url_encode(private_pem),
-                    'subject': self.config['web_push']['vapid_subject']
-                }
+        # Gerar novas chaves VAPID
+        try:
+            private_key = ec.generate_private_key(ec.SECP256R1(), default_backend())
 
-                # Salvar chaves
-                with open(vapid_file, 'w') as f:
-                    json.dump(vapid_keys, f, indent=2)
+            # Chave pública: ponto não comprimido (0x04 || X || Y)
+            public_numbers = private_key.public_key().public_numbers()
+            public_raw = (b'\x04' + public_numbers.x.to_bytes(32, 'big')
+                          + public_numbers.y.to_bytes(32, 'big'))
 
-                # Atualizar configuração
-                self.config['web_push']['vapid_public_key'] = vapid_keys['publicKey']
-                self.config['web_push']['vapid_private_key'] = vapid_keys['privateKey']
+            private_der = private_key.private_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()
+            )
 
-                print("🔑 Chaves VAPID geradas")
+            vapid_keys = {
+                'publicKey': _b64url_encode(public_raw),
+                'privateKey': _b64url_encode(private_der),
+                'subject': self.config['web_push']['vapid_subject']
+            }
 
-            except Exception as e:
-                print(f"❌ Erro ao gerar chaves VAPID: {e}")
-        else:
-            # Carregar chaves existentes
-            try:
-                with open(vapid_file, 'r') as f:
-                    vapid_keys = json.load(f)
+            # Salvar chaves
+            with open(vapid_file, 'w') as f:
+                json.dump(vapid_keys, f, indent=2)
 
-                self.config['web_push']['vapid_public_key'] = vapid_keys['publicKey']
-                self.config['web_push']['vapid_private_key'] = vapid_keys['privateKey']
+            # Atualizar configuração
+            self.config['web_push']['vapid_public_key'] = vapid_keys['publicKey']
+            self.config['web_push']['vapid_private_key'] = vapid_keys['privateKey']
 
-                print("🔑 Chaves VAPID carregadas")
+            print("🔑 Chaves VAPID geradas")
 
-            except Exception as e:
-                print(f"❌ Erro ao carregar chaves VAPID: {e}")
+        except Exception as e:
+            print(f"❌ Erro ao gerar chaves VAPID: {e}")
 
     def _load_subscriptions(self):
         """Carregar subscrições do banco"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                SELECT id, endpoint, p256dh, auth, device_type, user_agent,
-                       device_id, user_id, created_at, last_used, active, metadata
-                FROM push_subscriptions
-                WHERE active = 1
-            ''')
-
-            for row in cursor.fetchall():
+            for row in self._conn().execute(LOAD_SUBSCRIPTIONS_SQL):
                 subscription = PushSubscription(
                     id=row[0],
                     endpoint=row[1],
@@ -459,12 +616,13 @@ function syncPendingNotifications() {
                     user_id=row[7],
                     created_at=row[8],
                     last_used=row[9],
-                    active=bool(row[10])
+                    active=bool(row[10]),
+                    provider=_classify_provider(row[1])
                 )
 
                 self.subscriptions[subscription.id] = subscription
+                self._by_endpoint[subscription.endpoint] = subscription.id
 
-            conn.close()
             print(f"📱 {len(self.subscriptions)} subscrições carregadas")
 
         except Exception as e:
@@ -499,11 +657,13 @@ function syncPendingNotifications() {
                 user_id=user_id,
                 created_at=datetime.now().isoformat(),
                 last_used=datetime.now().isoformat(),
-                active=True
+                active=True,
+                provider=_classify_provider(endpoint)
             )
 
             # Salvar
             self.subscriptions[subscription_id] = subscription
+            self._by_endpoint[endpoint] = subscription_id
             self._save_subscription(subscription)
 
             logger.info(f"Nova subscrição registrada: {subscription_id}")
@@ -515,23 +675,17 @@ function syncPendingNotifications() {
 
     def _get_subscription_by_endpoint(self, endpoint: str) -> Optional[PushSubscription]:
         """Obter subscrição por endpoint"""
-        for sub in self.subscriptions.values():
-            if sub.endpoint == endpoint:
-                return sub
-        return None
+        subscription_id = self._by_endpoint.get(endpoint)
+        return self.subscriptions.get(subscription_id) if subscription_id else None
 
     def _save_subscription(self, subscription: PushSubscription):
         """Salvar subscrição no banco"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+        self._save_subscriptions_bulk([subscription])
 
-            cursor.execute('''
-                INSERT OR REPLACE INTO push_subscriptions
-                (id, endpoint, p256dh, auth, device_type, user_agent,
-                 device_id, user_id, created_at, last_used, active, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+    def _save_subscriptions_bulk(self, subscriptions: List[PushSubscription]):
+        """Salvar várias subscrições numa única transação"""
+        try:
+            rows = [(
                 subscription.id, subscription.endpoint,
                 subscription.keys.get('p256dh', ''),
                 subscription.keys.get('auth', ''),
@@ -541,14 +695,35 @@ function syncPendingNotifications() {
                 subscription.user_id, subscription.created_at,
                 subscription.last_used, subscription.active,
                 json.dumps(subscription.device_info)
-            ))
+            ) for subscription in subscriptions]
 
-            conn.commit()
-            conn.close()
+            conn = self._conn()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(SAVE_SUBSCRIPTION_SQL, rows)
 
         except Exception as e:
             logger.error(f"Erro ao salvar subscrição: {e}")
 
+    def _touch_subscriptions(self, subscription_ids: List[str]):
+        """Atualizar last_used das subscrições entregues num único executemany"""
+        if not subscription_ids:
+            return
+
+        try:
+            now = datetime.now().isoformat()
+            for subscription_id in subscription_ids:
+                subscription = self.subscriptions.get(subscription_id)
+                if subscription:
+                    subscription.last_used = now
+
+            conn = self._conn()
+            with conn:
+                conn.executemany(UPDATE_LAST_USED_SQL, [(now, sid) for sid in subscription_ids])
+
+        except Exception as e:
+            logger.error(f"Erro ao atualizar last_used: {e}")
+
     def unsubscribe_device(self, subscription_id: str) -> bool:
         """Cancelar subscrição de dispositivo"""
         try:
@@ -564,14 +739,104 @@ function syncPendingNotifications() {
             logger.error(f"Erro ao cancelar subscrição: {e}")
             return False
 
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Obter o loop de envio (criado na primeira utilização)"""
+        with self._loop_lock:
+            if self._closed:
+                raise RuntimeError("Sistema de push encerrado")
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._run_loop, args=(self._loop,),
+                                                     name='push-sender', daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        """Corpo da thread de envio: corre o loop até stop() e fecha-o"""
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _run(self, coro):
+        """Executar corrotina no loop de envio e aguardar o resultado"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Cliente HTTP/2 partilhado (criado dentro do loop de envio)"""
+        if self._http is None:
+            batch_size = self.config['settings']['batch_size']
+            # Com HTTP/2 cada conexão multiplexa até 100 envios simultâneos
+            max_connections = (math.ceil(batch_size / FCM_STREAMS_PER_CONNECTION)
+                               if HTTP2_AVAILABLE else batch_size)
+            self._http = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections),
+                timeout=10
+            )
+        return self._http
+
+    def close(self):
+        """Encerrar o sistema: fechar clientes HTTP, loop de envio e threads
+
+        Definitivo: envios posteriores falham (criar uma nova instância).
+        """
+        with self._loop_lock:
+            if self._closed:
+                return
+            self._closed = True
+            loop, self._loop = self._loop, None
+            loop_thread, self._loop_thread = self._loop_thread, None
+
+        if loop is not None:
+            if self._http is not None:
+                asyncio.run_coroutine_threadsafe(self._http.aclose(), loop).result()
+                self._http = None
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join(timeout=5)
+
+        self._pool.shutdown(wait=True)
+        self._http_session.close()
+
+        # Fechar só conexões ociosas: a desta thread e as de threads já
+        # terminadas; as de threads ainda vivas ficam para o weakref.finalize
+        current = threading.current_thread()
+        with self._connections_lock:
+            idle = [thread for thread in self._connections
+                    if thread is current or not thread.is_alive()]
+            connections = [self._connections.pop(thread) for thread in idle]
+        for conn in connections:
+            conn.close()
+
     def send_notification(self, message: PushMessage, target_users: List[str] = None,
                          target_types: List[NotificationType] = None) -> Dict[str, Any]:
-        """Enviar notificação push"""
+        """Enviar notificação push (interface síncrona)"""
+        if self._closed:
+            return {'success': False, 'error': 'Push system closed', 'sent_count': 0}
+        return self._run(self._send_notification(message, target_users, target_types))
+
+    async def send_notification_async(self, message: PushMessage, target_users: List[str] = None,
+                                      target_types: List[NotificationType] = None) -> Dict[str, Any]:
+        """Enviar notificação push a partir de qualquer loop asyncio"""
+        if self._closed:
+            return {'success': False, 'error': 'Push system closed', 'sent_count': 0}
+        # Cliente HTTP, rate limiter e lock do FCM pertencem ao loop de envio
+        future = asyncio.run_coroutine_threadsafe(
+            self._send_notification(message, target_users, target_types), self._get_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _send_notification(self, message: PushMessage, target_users: List[str] = None,
+                                 target_types: List[NotificationType] = None) -> Dict[str, Any]:
+        """Enviar notificação push (executa no loop de envio)"""
         try:
             logger.info(f"Enviando notificação: {message.title}")
+            loop = asyncio.get_running_loop()
 
-            # Filtrar subscrições
-            target_subscriptions = self._filter_subscriptions(target_users, target_types)
+            # Filtrar subscrições (SQLite fora do loop)
+            target_subscriptions = await loop.run_in_executor(
+                self._pool, self._filter_subscriptions, target_users, target_types)
 
             if not target_subscriptions:
                 logger.warning("Nenhuma subscrição válida encontrada")
@@ -596,10 +861,16 @@ function syncPendingNotifications() {
             }
 
             # Enviar em lotes
-            results = self._send_in_batches(target_subscriptions, payload, message)
+            results = await self._send_in_batches(target_subscriptions, payload, message)
+
+            # last_used de todos os entregues numa única escrita
+            await loop.run_in_executor(
+                self._pool, self._touch_subscriptions,
+                [detail['subscription_id'] for detail in results['details']
+                 if detail['status'] == 'sent'])
 
             # Salvar histórico
-            self._save_message_history(message, results)
+            await loop.run_in_executor(self._pool, self._save_message_history, message, results)
 
             return {
                 'success': True,
@@ -621,11 +892,23 @@ function syncPendingNotifications() {
     def _filter_subscriptions(self, target_users: List[str] = None,
                              target_types: List[NotificationType] = None) -> List[PushSubscription]:
         """Filtrar subscrições por critérios"""
-        subscriptions = list(self.subscriptions.values())
-
-        # Filtrar por usuários
+        # Filtrar por usuários (índice user_id/active no banco)
         if target_users:
-            subscriptions = [sub for sub in subscriptions if sub.user_id in target_users]
+            conn = self._conn()
+            target_users = list(dict.fromkeys(target_users))
+            subscriptions = []
+            # Lotes abaixo do limite de parâmetros do SQLite
+            for i in range(0, len(target_users), 500):
+                chunk = target_users[i:i + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'SELECT id FROM push_subscriptions WHERE active = 1 AND user_id IN ({placeholders})',
+                    chunk
+                )
+                subscriptions.extend(self.subscriptions[row[0]] for row in rows
+                                     if row[0] in self.subscriptions)
+        else:
+            subscriptions = list(self.subscriptions.values())
 
         # Filtrar por tipos (implementar lógica de preferências)
         if target_types:
@@ -638,8 +921,8 @@ function syncPendingNotifications() {
 
         return subscriptions
 
-    def _send_in_batches(self, subscriptions: List[PushSubscription],
-                        payload: Dict[str, Any], message: PushMessage) -> Dict[str, Any]:
+    async def _send_in_batches(self, subscriptions: List[PushSubscription],
+                               payload: Dict[str, Any], message: PushMessage) -> Dict[str, Any]:
         """Enviar notificações em lotes"""
         batch_size = self.config['settings']['batch_size']
         results = {
@@ -648,36 +931,41 @@ function syncPendingNotifications() {
             'details': []
         }
 
-        for i in range(0, len(subscriptions), batch_size):
-            batch = subscriptions[i:i + batch_size]
-            batch_results = self._send_batch(batch, payload, message)
+        # Lotes em paralelo; o ritmo é controlado pelo token bucket de cada envio
+        tasks = [asyncio.create_task(self._send_batch(subscriptions[i:i + batch_size], payload, message))
+                 for i in range(0, len(subscriptions), batch_size)]
 
+        for batch_results in await asyncio.gather(*tasks):
             results['sent_count'] += batch_results['sent_count']
             results['failed_count'] += batch_results['failed_count']
             results['details'].extend(batch_results['details'])
 
-            # Pequena pausa entre lotes
-            if i + batch_size < len(subscriptions):
-                time.sleep(1)
-
         return results
 
-    def _send_batch(self, subscriptions: List[PushSubscription],
-                   payload: Dict[str, Any], message: PushMessage) -> Dict[str, Any]:
-        """Enviar lote de notificações"""
+    async def _send_batch(self, subscriptions: List[PushSubscription],
+                          payload: Dict[str, Any], message: PushMessage) -> Dict[str, Any]:
+        """Enviar lote de notificações (envios concorrentes)"""
         results = {
             'sent_count': 0,
             'failed_count': 0,
             'details': []
         }
 
-        for subscription in subscriptions:
-            try:
-                # Determinar provedor
-                provider = self._detect_provider(subscription)
+        async def send_one(subscription: PushSubscription, provider: PushProvider) -> bool:
+            await self._rate_limiter.acquire()
+            return await self.providers[provider](subscription, payload, message)
+
+        # Determinar provedor e enviar todo o lote em paralelo
+        providers = [subscription.provider for subscription in subscriptions]
+        outcomes = await asyncio.gather(
+            *(send_one(subscription, provider) for subscription, provider in zip(subscriptions, providers)),
+            return_exceptions=True
+        )
 
-                # Enviar via provedor
-                success = self.providers[provider](subscription, payload, message)
+        for subscription, provider, success in zip(subscriptions, providers, outcomes):
+            try:
+                if isinstance(success, Exception):
+                    raise success
 
                 if success:
                     results['sent_count'] += 1
@@ -706,20 +994,8 @@ function syncPendingNotifications() {
 
         return results
 
-    def _detect_provider(self, subscription: PushSubscription) -> PushProvider:
-        """Detectar provedor baseado na subscrição"""
-        endpoint = subscription.endpoint.lower()
-
-        if 'fcm' in endpoint or 'firebase' in endpoint:
-            return PushProvider.FCM
-        elif 'webpush' in endpoint or 'mozilla' in endpoint or 'chrome' in endpoint:
-            return PushProvider.WEB_PUSH
-        else:
-            # Por padrão, usar Web Push
-            return PushProvider.WEB_PUSH
-
-    def _send_web_push(self, subscription: PushSubscription, payload: Dict[str, Any],
-                      message: PushMessage) -> bool:
+    async def _send_web_push(self, subscription: PushSubscription, payload: Dict[str, Any],
+                             message: PushMessage) -> bool:
         """Enviar via Web Push"""
         try:
             if not self.config['web_push']['enabled']:
@@ -738,29 +1014,55 @@ function syncPendingNotifications() {
                 'timestamp': int(time.time())
             }
 
-            # Enviar usando pywebpush
-            pywebpush(
-                webpush_subscription_info={
-                    'endpoint': subscription.endpoint,
-                    'keys': subscription.keys
-                },
-                data=json.dumps(data),
-                vapid_private_key=self.config['web_push']['vapid_private_key'],
-                vapid_claims={
-                    'aud': subscription.endpoint,
-                    'exp': int(time.time()) + message.ttl,
-                    'sub': self.config['web_push']['vapid_subject']
-                }
+            # Enviar usando pywebpush (síncrono, no pool de threads de envio) com
+            # o JWT VAPID já assinado para a origem do endpoint
+            pusher = pywebpush.WebPusher(
+                {'endpoint': subscription.endpoint, 'keys': subscription.keys},
+                requests_session=self._http_session
             )
+            send = functools.partial(
+                pusher.send,
+                json.dumps(data),
+                headers=self._vapid_headers(subscription.endpoint),
+                ttl=message.ttl,
+                timeout=10
+            )
+            response = await asyncio.get_running_loop().run_in_executor(self._pool, send)
 
+            if response.status_code > 202:
+                logger.error(f"Web Push recusado para {subscription.id}: HTTP {response.status_code}")
+                return False
             return True
 
         except Exception as e:
             logger.error(f"Erro no Web Push para {subscription.id}: {e}")
             return False
 
-    def _send_fcm_push(self, subscription: PushSubscription, payload: Dict[str, Any],
-                      message: PushMessage) -> bool:
+    def _vapid_headers(self, endpoint: str) -> Dict[str, str]:
+        """Headers VAPID da origem do endpoint (assinatura reutilizada até perto do exp)"""
+        parts = urlsplit(endpoint)
+        aud = f"{parts.scheme}://{parts.netloc}"
+        now = time.time()
+
+        with self._vapid_lock:
+            cached = self._vapid_jwt_cache.get(aud)
+            if cached and now < cached[1] - VAPID_JWT_REFRESH_MARGIN:
+                return dict(cached[0])
+
+            if self._vapid is None:
+                self._vapid = Vapid.from_string(private_key=self.config['web_push']['vapid_private_key'])
+
+            exp = int(now) + VAPID_JWT_LIFETIME
+            headers = self._vapid.sign({
+                'aud': aud,
+                'exp': exp,
+                'sub': self.config['web_push']['vapid_subject']
+            })
+            self._vapid_jwt_cache[aud] = (headers, exp)
+            return dict(headers)
+
+    async def _send_fcm_push(self, subscription: PushSubscription, payload: Dict[str, Any],
+                             message: PushMessage) -> bool:
         """Enviar via Firebase Cloud Messaging"""
         try:
             if not self.config['firebase']['enabled']:
@@ -773,41 +1075,46 @@ function syncPendingNotifications() {
                 logger.warning(f"Token FCM não encontrado para {subscription.id}")
                 return False
 
-            # Preparar payload FCM
+            access_token = await self._get_fcm_access_token()
+            if not access_token:
+                return False
+
+            # Preparar payload FCM HTTP v1 (valores de data têm de ser strings)
+            notification = {'title': message.title, 'body': message.body}
+            if message.image:
+                notification['image'] = message.image
+
             fcm_payload = {
-                'to': fcm_token,
-                'notification': {
-                    'title': message.title,
-                    'body': message.body,
-                    'icon': message.icon,
-                    'badge': message.badge,
-                    'image': message.image,
-                    'click_action': message.click_action,
-                    'sound': message.sound,
-                    'tag': message.notification_type.value
-                },
-                'data': {
-                    'type': message.notification_type.value,
-                    'timestamp': str(int(time.time())),
-                    **message.data
-                },
-                'priority': message.priority,
-                'time_to_live': message.ttl
+                'message': {
+                    'token': fcm_token,
+                    'notification': notification,
+                    'data': {
+                        'type': message.notification_type.value,
+                        'timestamp': str(int(time.time())),
+                        **{key: str(value) for key, value in message.data.items()}
+                    },
+                    'android': {
+                        'priority': 'HIGH' if message.priority == 'high' else 'NORMAL',
+                        'ttl': f'{message.ttl}s',
+                        'notification': {
+                            'icon': message.icon,
+                            'sound': message.sound,
+                            'tag': message.notification_type.value,
+                            'click_action': message.click_action
+                        }
+                    }
+                }
             }
 
             # Headers
             headers = {
-                'Authorization': f'key={self.config["firebase"]["server_key"]}',
+                'Authorization': f'Bearer {access_token}',
                 'Content-Type': 'application/json'
             }
 
-            # Enviar
-            response = requests.post(
-                'https://fcm.googleapis.com/fcm/send',
-                json=fcm_payload,
-                headers=headers,
-                timeout=10
-            )
+            # Enviar pelo cliente HTTP/2 partilhado
+            url = FCM_SEND_URL.format(project_id=self.config['firebase']['project_id'])
+            response = await self._get_http().post(url, json=fcm_payload, headers=headers)
 
             return response.status_code == 200
 
@@ -815,6 +1122,34 @@ function syncPendingNotifications() {
             logger.error(f"Erro no FCM para {subscription.id}: {e}")
             return False
 
+    async def _get_fcm_access_token(self) -> Optional[str]:
+        """Obter token OAuth2 da service account (renovado perto da expiração)"""
+        async with self._fcm_token_lock:
+            if self._fcm_access_token and time.time() < self._fcm_token_expiry - FCM_TOKEN_REFRESH_MARGIN:
+                return self._fcm_access_token
+
+            if not GOOGLE_AUTH_AVAILABLE:
+                logger.warning("google-auth não instalado; FCM HTTP v1 indisponível")
+                return None
+
+            credentials_path = self.config['firebase'].get('credentials_path')
+            if not credentials_path or not self.config['firebase'].get('project_id'):
+                logger.warning("FCM sem credentials_path/project_id configurados")
+                return None
+
+            if self._fcm_credentials is None:
+                self._fcm_credentials = service_account.Credentials.from_service_account_file(
+                    credentials_path, scopes=FCM_SCOPES)
+
+            # refresh() é bloqueante (HTTP para o Google OAuth2)
+            await asyncio.get_running_loop().run_in_executor(
+                self._pool, self._fcm_credentials.refresh, GoogleAuthRequest(self._http_session))
+
+            self._fcm_access_token = self._fcm_credentials.token
+            # expiry do google-auth é UTC sem tzinfo
+            self._fcm_token_expiry = self._fcm_credentials.expiry.replace(tzinfo=timezone.utc).timestamp()
+            return self._fcm_access_token
+
     def _extract_fcm_token(self, subscription: PushSubscription) -> Optional[str]:
         """Extrair token FCM da subscrição"""
         # Tentar extrair do endpoint
@@ -832,11 +1167,11 @@ function syncPendingNotifications() {
 
         return None
 
-    def _send_firebase_push(self, subscription: PushSubscription, payload: Dict[str, Any],
-                           message: PushMessage) -> bool:
+    async def _send_firebase_push(self, subscription: PushSubscription, payload: Dict[str, Any],
+                                  message: PushMessage) -> bool:
         """Enviar via Firebase (legacy)"""
         # Implementação similar ao FCM mas usando API legacy
-        return self._send_fcm_push(subscription, payload, message)
+        return await self._send_fcm_push(subscription, payload, message)
 
     def create_notification_template(self, notification_type: NotificationType,
                                    data: Dict[str, Any]) -> PushMessage:
@@ -929,24 +1264,15 @@ function syncPendingNotifications() {
     def _save_message_history(self, message: PushMessage, results: Dict[str, Any]):
         """Salvar histórico de mensagem"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT INTO push_messages
-                (id, title, body, icon, badge, image, click_action, data,
-                 type, priority, ttl, sent_at, success_count, failure_count, provider_responses)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                message.id, message.title, message.body, message.icon,
-                message.badge, message.image, message.click_action, json.dumps(message.data),
-                message.notification_type.value, message.priority, message.ttl,
-                datetime.now().isoformat(), results['sent_count'], results['failed_count'],
-                json.dumps(results['details'])
-            ))
-
-            conn.commit()
-            conn.close()
+            conn = self._conn()
+            with conn:
+                conn.execute(SAVE_MESSAGE_SQL, (
+                    message.id, message.title, message.body, message.icon,
+                    message.badge, message.image, message.click_action, json.dumps(message.data),
+                    message.notification_type.value, message.priority, message.ttl,
+                    datetime.now().isoformat(), results['sent_count'], results['failed_count'],
+                    json.dumps(results['details'])
+                ))
 
         except Exception as e:
             logger.error(f"Erro ao salvar histórico: {e}")
@@ -954,8 +1280,7 @@ function syncPendingNotifications() {
     def get_statistics(self) -> Dict[str, Any]:
         """Obter estatísticas de push notifications"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._conn().cursor()
 
             # Total de subscrições ativas
             cursor.execute('''
@@ -996,8 +1321,6 @@ function syncPendingNotifications() {
 
             by_type = {row[0]: row[1] for row in cursor.fetchall()}
 
-            conn.close()
-
             return {
                 'active_subscriptions': active_subscriptions,
                 'messages_today': messages_today,